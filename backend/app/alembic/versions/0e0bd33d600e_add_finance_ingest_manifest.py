@@ -0,0 +1,46 @@
+"""Add finance ingest manifest
+
+Revision ID: 0e0bd33d600e
+Revises: b73622d2d879
+Create Date: 2026-10-17 15:22:54.207719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '0e0bd33d600e'
+down_revision = 'b73622d2d879'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per DOE-25 workbook seen by app/ingest_finance.py, so later runs only
+    # parse workbooks that are new or whose content changed
+    op.execute("""
+        CREATE TABLE finance_ingest_manifest (
+            id SERIAL PRIMARY KEY,
+            file_path VARCHAR(500) NOT NULL,
+            district_id_fk INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            size BIGINT NOT NULL,
+            sha256 CHAR(64) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            error TEXT,
+            date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            date_updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT fk_finance_ingest_manifest_district
+                FOREIGN KEY (district_id_fk)
+                REFERENCES district(id)
+                ON DELETE CASCADE,
+            CONSTRAINT unique_finance_ingest_manifest_file_path
+                UNIQUE (file_path)
+        )
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS finance_ingest_manifest")
@@ -15,6 +15,8 @@ import yaml
 from datetime import datetime
 import logging
 
+from app.service.internal.dataset_cache import copy_datasets, read_datasets, write_datasets
+
 # Add this near the top of the file
 logger = logging.getLogger('alembic.runtime.migration')
 
@@ -24,6 +26,10 @@ down_revision = 'b4f374d72f78'
 branch_labels = None
 depends_on = None
 
+# Cached datasets, named after the tables they load, in load order
+DATASETS = ['town', 'sau', 'sau_staff', 'district', 'town_district_xref', 'region', 'school_type', 'grades',
+            'school', 'school_grade_xref', 'district_grade_xref']
+
 
 def load_config():
     """Load configuration from YAML file."""
@@ -364,8 +370,8 @@ def process_school_data(df, config, district_data, sau_data, grades_data, region
     
     return {'schools': schools}
 
-def generate_sql(grades_data, region_data, school_type_data, district_data, town_data, sau_data, school_data):
-    """Generate SQL INSERT statements using pre-processed data structures.
+def build_datasets(grades_data, region_data, school_type_data, district_data, town_data, sau_data, school_data):
+    """Build a table of rows for each target table from the pre-processed data structures.
     
     Args:
         grades_data: Dictionary of grade information
@@ -377,223 +383,163 @@ def generate_sql(grades_data, region_data, school_type_data, district_data, town
         school_data: Dictionary of school information
     
     Returns:
-        String containing all SQL INSERT statements
+        Dictionary of table name to DataFrame, in load order. date_created and
+        date_updated are left to the column defaults.
     """
     
     def clean_string(value):
-        """Clean and escape a string for SQL."""
+        """Clean a string value, None if it is missing or empty."""
         if pd.isna(value) or value == '':
-            return "NULL"
-        # Replace single quotes with two single quotes for SQL
-        cleaned = str(value).replace("'", "''")
-        return f"'{cleaned}'"
+            return None
+        return str(value)
 
     def clean_string_not_null(value):
-        """Clean and escape a string for SQL, returning empty string if NULL."""
+        """Clean a string value, empty string if it is missing."""
         if pd.isna(value) or value == '':
-            return "''"
-        # Replace single quotes with two single quotes for SQL
-        cleaned = str(value).replace("'", "''")
-        return f"'{cleaned}'"
-
-    def parse_date(date_str):
-        """Parse a date string and return an SQL-formatted date."""
-        if pd.isna(date_str) or date_str == '':
-            return "CURRENT_TIMESTAMP"
-        try:
-            date_obj = datetime.strptime(date_str, '%m/%d/%Y %I:%M:%S %p')
-            return f"'{date_obj.strftime('%Y-%m-%d')}'"
-        except:
-            return "CURRENT_TIMESTAMP"
-
-    # Initialize SQL statement collections
-    sau_sql = []
-    sau_staff_sql = []
-    district_sql = []
-    town_sql = []
-    town_district_xref_sql = []
-    region_sql = []
-    school_type_sql = []
-    grades_sql = []
-    school_sql = []
-    school_grade_xref_sql = []
-    district_grade_xref_sql = []
-
-    # Generate SAU and SAU staff INSERT statements
+            return ''
+        return str(value)
+
+    def clean_id(value):
+        """An ID as an integer, None if it is missing."""
+        if value is None or pd.isna(value):
+            return None
+        return int(value)
+
+    def frame(rows, columns, integer_columns):
+        """DataFrame with nullable integer ID columns and string columns everywhere else."""
+        df = pd.DataFrame(rows, columns=columns)
+        return df.astype({
+            column: 'Int64' if column in integer_columns else ('boolean' if column == 'is_public' else 'string')
+            for column in columns
+        })
+
+    # Initialize row collections
+    sau_rows = []
+    sau_staff_rows = []
+    district_rows = []
+    town_rows = []
+    town_district_xref_rows = []
+    school_rows = []
+    school_grade_xref_rows = []
+    district_grade_xref_rows = []
+
+    # SAU and SAU staff rows
     for sau_id, sau_info in sau_data.items():
-        sau_sql.append(
-            f"INSERT INTO sau (id, name, address1, address2, town, town_id_fk, state, zip, phone, fax, webpage, "
-            f"date_created, date_updated) VALUES ("
-            f"{sau_id}, "
-            f"{clean_string_not_null(sau_info.get('name', ''))}, "
-            f"{clean_string(sau_info.get('address1'))}, "
-            f"{clean_string(sau_info.get('address2'))}, "
-            f"{clean_string(sau_info.get('town'))}, "
-            f"{sau_info.get('town_id') if sau_info.get('town_id') is not None else 'NULL'}, "
-            f"{clean_string(sau_info.get('state'))}, "
-            f"{clean_string(sau_info.get('zip'))}, "
-            f"{clean_string(sau_info.get('phone'))}, "
-            f"{clean_string(sau_info.get('fax'))}, "
-            f"{clean_string(sau_info.get('webpage'))}, "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
+        sau_rows.append((
+            clean_id(sau_id),
+            clean_string_not_null(sau_info.get('name', '')),
+            clean_string(sau_info.get('address1')),
+            clean_string(sau_info.get('address2')),
+            clean_string(sau_info.get('town')),
+            clean_id(sau_info.get('town_id')),
+            clean_string(sau_info.get('state')),
+            clean_string(sau_info.get('zip')),
+            clean_string(sau_info.get('phone')),
+            clean_string(sau_info.get('fax')),
+            clean_string(sau_info.get('webpage'))
+        ))
         
-        # Generate SAU staff INSERT statements
         for staff in sau_info.get('staff', []):
             if pd.notna(staff.get('first_name')) or pd.notna(staff.get('last_name')):
-                sau_staff_sql.append(
-                    f"INSERT INTO sau_staff (sau_id_fk, first_name, last_name, title, admin_type, email, "
-                    f"date_created, date_updated) VALUES ("
-                    f"{sau_id}, "
-                    f"{clean_string_not_null(staff.get('first_name'))}, "
-                    f"{clean_string_not_null(staff.get('last_name'))}, "
-                    f"{clean_string(staff.get('title'))}, "
-                    f"'{staff.get('admin_type', 'SUP')}', "  # Default to SUP if not specified
-                    f"{clean_string(staff.get('email'))}, "
-                    f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-                )
-
-    # Generate district INSERT statements
+                sau_staff_rows.append((
+                    clean_id(sau_id),
+                    clean_string_not_null(staff.get('first_name')),
+                    clean_string_not_null(staff.get('last_name')),
+                    clean_string(staff.get('title')),
+                    str(staff.get('admin_type', 'SUP')),  # Default to SUP if not specified
+                    clean_string(staff.get('email'))
+                ))
+
+    # District rows and district-grade relationships
     for district_id, district_info in district_data.items():
-        district_sql.append(
-            f"INSERT INTO district (id, name, sau_id_fk, is_public, date_created, date_updated) "
-            f"VALUES ({district_id}, {clean_string_not_null(district_info['name'])}, "
-            f"{district_info['sau_id'] if district_info['sau_id'] is not None else 'NULL'}, "
-            f"{district_info['is_public']}, "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
+        district_rows.append((
+            clean_id(district_id),
+            clean_string_not_null(district_info['name']),
+            clean_id(district_info['sau_id']),
+            bool(district_info['is_public'])
+        ))
         
-        # Generate district-grade relationships
         if 'grade_ids' in district_info:
             for grade_id in district_info['grade_ids']:
-                district_grade_xref_sql.append(
-                    f"INSERT INTO district_grade_xref (district_id_fk, grade_id_fk, date_created, date_updated) "
-                    f"VALUES ({district_id}, {grade_id}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-                )
+                district_grade_xref_rows.append((clean_id(district_id), grade_id))
 
-    # Generate town INSERT statements
+    # Town rows and town-district relationships
     for town_id, town_info in town_data.items():
-        town_sql.append(
-            f"INSERT INTO town (id, name, date_created, date_updated) "
-            f"VALUES ({town_id}, {clean_string(town_info['name'])}, "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
+        town_rows.append((clean_id(town_id), clean_string(town_info['name'])))
         
-        # Generate town-district relationships
         if 'district_ids' in town_info:
             for district_id in town_info['district_ids']:
-                town_district_xref_sql.append(
-                    f"INSERT INTO town_district_xref (town_id_fk, district_id_fk, date_created, date_updated) "
-                    f"VALUES ({town_id}, {district_id}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-                )
+                town_district_xref_rows.append((clean_id(town_id), clean_id(district_id)))
         elif 'district_id' in town_info and town_info['district_id'] is not None:
-            town_district_xref_sql.append(
-                f"INSERT INTO town_district_xref (town_id_fk, district_id_fk, date_created, date_updated) "
-                f"VALUES ({town_id}, {town_info['district_id']}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-            )
+            town_district_xref_rows.append((clean_id(town_id), clean_id(town_info['district_id'])))
 
-    # Generate region INSERT statements
-    for region_name, region_id in region_data.items():
-        region_sql.append(
-            f"INSERT INTO region (id, name, date_created, date_updated) "
-            f"VALUES ({region_id}, {clean_string(region_name)}, "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
-
-    # Generate school type INSERT statements
-    for type_name, type_id in school_type_data.items():
-        school_type_sql.append(
-            f"INSERT INTO school_type (id, name, date_created, date_updated) "
-            f"VALUES ({type_id}, {clean_string(type_name)}, "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
-
-    # Generate grades INSERT statements
-    for grade_key, grade_info in grades_data.items():
-        grades_sql.append(
-            f"INSERT INTO grades (id, name, date_created, date_updated) "
-            f"VALUES ({grade_info['id']}, '{grade_info['name']}', "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
-
-    # Generate school and school_grade_xref INSERT statements
+    region_rows = [(region_id, region_name) for region_name, region_id in region_data.items()]
+    school_type_rows = [(type_id, type_name) for type_name, type_id in school_type_data.items()]
+    grades_rows = [(grade_info['id'], grade_info['name']) for grade_info in grades_data.values()]
+
+    # School rows and school-grade relationships
     for school_id, school_info in school_data['schools'].items():
-        # Construct the INSERT statement as a single string
-        sql_statement = (
-            f"INSERT INTO school (id, name, sau_id_fk, district_id_fk, region_id_fk, school_type_id_fk, "
-            f"principal_first_name, principal_last_name, address1, address2, city, town_id_fk, state, zip, phone, "
-            f"fax, email, county, webpage, date_created, date_updated) VALUES ("
-            f"{school_id}, "
-            f"{clean_string(school_info['name'])}, "
-            f"{school_info['sau_id'] if school_info['sau_id'] is not None else 'NULL'}, "
-            f"{school_info['district_id'] if school_info['district_id'] is not None else 'NULL'}, "
-            f"{school_info['region_id'] if school_info['region_id'] is not None else 'NULL'}, "
-            f"{school_info['school_type_id'] if school_info['school_type_id'] is not None else 'NULL'}, "
-            f"{clean_string(school_info['principal_first_name'])}, "
-            f"{clean_string(school_info['principal_last_name'])}, "
-            f"{clean_string(school_info['address1'])}, "
-            f"{clean_string(school_info['address2'])}, "
-            f"{clean_string(school_info['city'])}, "
-            f"{school_info['town_id'] if school_info['town_id'] is not None else 'NULL'}, "
-            f"{clean_string(school_info['state'])}, "
-            f"{clean_string(school_info['zip'])}, "
-            f"{clean_string(school_info['phone'])}, "
-            f"{clean_string(school_info['fax'])}, "
-            f"{clean_string(school_info['email'])}, "
-            f"{clean_string(school_info['county'])}, "
-            f"{clean_string(school_info['webpage'])}, "
-            f"CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-        )
-        school_sql.append(sql_statement)
-
-        # Generate school-grade relationships
+        school_rows.append((
+            clean_id(school_id),
+            clean_string(school_info['name']),
+            clean_id(school_info['sau_id']),
+            clean_id(school_info['district_id']),
+            clean_id(school_info['region_id']),
+            clean_id(school_info['school_type_id']),
+            clean_string(school_info['principal_first_name']),
+            clean_string(school_info['principal_last_name']),
+            clean_string(school_info['address1']),
+            clean_string(school_info['address2']),
+            clean_string(school_info['city']),
+            clean_id(school_info['town_id']),
+            clean_string(school_info['state']),
+            clean_string(school_info['zip']),
+            clean_string(school_info['phone']),
+            clean_string(school_info['fax']),
+            clean_string(school_info['email']),
+            clean_string(school_info['county']),
+            clean_string(school_info['webpage'])
+        ))
+
         for grade_id in school_info['grade_ids']:
-            school_grade_xref_sql.append(
-                f"INSERT INTO school_grade_xref (school_id_fk, grade_id_fk, date_created, date_updated) "
-                f"VALUES ({school_id}, {grade_id}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);"
-            )
+            school_grade_xref_rows.append((clean_id(school_id), grade_id))
 
-    # Combine all SQL statements with section headers
-    all_sql = []
-    all_sql.append("-- Town table INSERT statements")
-    all_sql.extend(town_sql)
-    all_sql.append("\n-- SAU table INSERT statements")
-    all_sql.extend(sau_sql)
-    all_sql.append("\n-- SAU Staff table INSERT statements")
-    all_sql.extend(sau_staff_sql)
-    all_sql.append("\n-- District table INSERT statements")
-    all_sql.extend(district_sql)
-    all_sql.append("\n-- Town-District relationships")
-    all_sql.extend(town_district_xref_sql)
-    all_sql.append("\n-- Region table INSERT statements")
-    all_sql.extend(region_sql)
-    all_sql.append("\n-- School Type table INSERT statements")
-    all_sql.extend(school_type_sql)
-    all_sql.append("\n-- Grades table INSERT statements")
-    all_sql.extend(grades_sql)
-    all_sql.append("\n-- School table INSERT statements")
-    all_sql.extend(school_sql)
-    all_sql.append("\n-- School-Grade relationships")
-    all_sql.extend(school_grade_xref_sql)
-    all_sql.append("\n-- District-Grade relationships")  
-    all_sql.extend(district_grade_xref_sql)
-
-    return "\n".join(all_sql)
+    # In load order, referenced tables first
+    return {
+        'town': frame(town_rows, ['id', 'name'], {'id'}),
+        'sau': frame(sau_rows, ['id', 'name', 'address1', 'address2', 'town', 'town_id_fk', 'state', 'zip',
+                                'phone', 'fax', 'webpage'], {'id', 'town_id_fk'}),
+        'sau_staff': frame(sau_staff_rows, ['sau_id_fk', 'first_name', 'last_name', 'title', 'admin_type', 'email'],
+                           {'sau_id_fk'}),
+        'district': frame(district_rows, ['id', 'name', 'sau_id_fk', 'is_public'], {'id', 'sau_id_fk'}),
+        'town_district_xref': frame(town_district_xref_rows, ['town_id_fk', 'district_id_fk'],
+                                    {'town_id_fk', 'district_id_fk'}),
+        'region': frame(region_rows, ['id', 'name'], {'id'}),
+        'school_type': frame(school_type_rows, ['id', 'name'], {'id'}),
+        'grades': frame(grades_rows, ['id', 'name'], {'id'}),
+        'school': frame(school_rows, ['id', 'name', 'sau_id_fk', 'district_id_fk', 'region_id_fk',
+                                      'school_type_id_fk', 'principal_first_name', 'principal_last_name',
+                                      'address1', 'address2', 'city', 'town_id_fk', 'state', 'zip', 'phone',
+                                      'fax', 'email', 'county', 'webpage'],
+                        {'id', 'sau_id_fk', 'district_id_fk', 'region_id_fk', 'school_type_id_fk', 'town_id_fk'}),
+        'school_grade_xref': frame(school_grade_xref_rows, ['school_id_fk', 'grade_id_fk'],
+                                   {'school_id_fk', 'grade_id_fk'}),
+        'district_grade_xref': frame(district_grade_xref_rows, ['district_id_fk', 'grade_id_fk'],
+                                     {'district_id_fk', 'grade_id_fk'}),
+    }
 
 def upgrade():
     # Load configuration
     config = load_config()
     
     try:
-        # Check for existing cache file first
+        # Check for cached datasets first
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        cache_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['sql_cache_dir']))
-        cache_file = os.path.join(cache_dir, f'{revision}_cache.sql')
+        cache_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['dataset_cache_dir']))
         
-        if os.path.exists(cache_file):
-            logger.info(f"Found existing SQL cache file at: {cache_file}")
-            with open(cache_file, 'r') as f:
-                sql_statements = f.read().split('\n')
+        datasets = read_datasets(cache_dir, revision, DATASETS)
+        if datasets is not None:
+            logger.info(f"Found cached datasets for {revision} in: {cache_dir}")
         else:
             # Generate all mapping data first
             grades_data = generate_grades_data()
@@ -635,8 +581,8 @@ def upgrade():
                 town_data
             )
 
-            # Generate school SQL with all mapping data
-            sql_statements_str = generate_sql(
+            # Build the table rows with all mapping data
+            datasets = build_datasets(
                 grades_data,
                 region_data,
                 school_type_data,
@@ -647,29 +593,11 @@ def upgrade():
             )
             
             # Save to cache
-            os.makedirs(cache_dir, exist_ok=True)
-            logger.info(f"Creating new SQL cache file at: {cache_file}")
-            with open(cache_file, 'w') as f:
-                f.write(sql_statements_str)
-            
-            logger.info(f"SQL INSERT statements have been generated and saved to {cache_file}")
-
-            # Split the generated string into a list of lines/statements for execution
-            sql_statements = sql_statements_str.split('\n')
-
-            # Optionally, update the log message to count non-empty lines starting with INSERT
-            insert_count = len([s for s in sql_statements if s.strip().startswith('INSERT INTO')])
-            logger.info(f"Generated {insert_count} INSERT statements")
-
-        # Execute SQL statements individually
-        for statement in sql_statements:
-            statement = statement.strip()
-            if statement:  # Skip empty statements
-                try:
-                    op.execute(sa.text(statement))
-                except Exception as e:
-                    logger.error(f"Error executing SQL statement: {e}\nStatement: {statement}")
-                    continue
+            write_datasets(cache_dir, revision, datasets, progress_logger=logger)
+
+        # Bulk load every table in the migration's transaction
+        rows = copy_datasets(op.get_bind(), datasets, progress_logger=logger)
+        logger.info(f"Loaded {rows} rows into {len(datasets)} tables")
     except Exception as e:
         logger.error(f"Error processing files: {str(e)}")
         raise  # Re-raise the exception to see the full traceback
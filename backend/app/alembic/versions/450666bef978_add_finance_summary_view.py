@@ -0,0 +1,73 @@
+"""Add finance summary materialized view
+
+Revision ID: 450666bef978
+Revises: a08f9343b0d5
+Create Date: 2026-10-17 11:03:27.552816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '450666bef978'
+down_revision = 'a08f9343b0d5'
+branch_labels = None
+depends_on = None
+
+# Fact table of each report field and the prefix of its type tables
+FINANCE_FACT_TABLES = {
+    'balance_sheets': ('balance_sheet', 'balance'),
+    'revenues': ('revenue', 'revenue'),
+    'expenditures': ('expenditure', 'expenditure'),
+}
+
+
+def summary_select(kind: str, fact_table: str, prefix: str) -> str:
+    """Totals of one fact table per DOE form, entry category and fund type."""
+    return f"""
+        SELECT
+            d.district_id_fk AS district_id,
+            d.year,
+            d.id AS doe_form_id,
+            '{kind}'::TEXT AS kind,
+            sc.id AS super_category_id,
+            sc.name AS super_category_name,
+            c.id AS category_id,
+            c.name AS category_name,
+            f.id AS fund_type_id,
+            f.state_id AS fund_state_id,
+            f.state_name AS fund_state_name,
+            COALESCE(SUM(fact.value), 0) AS total,
+            COUNT(*) AS row_count
+        FROM {fact_table} fact
+        JOIN doe_form d ON d.id = fact.doe_form_id_fk
+        JOIN {prefix}_entry_type et ON et.id = fact.{prefix}_entry_type_id_fk
+        JOIN {prefix}_entry_category_type c ON c.id = et.{prefix}_entry_category_type_id_fk
+        JOIN {prefix}_entry_super_category_type sc ON sc.id = c.{prefix}_entry_super_category_type_id_fk
+        JOIN {prefix}_fund_type f ON f.id = fact.{prefix}_fund_type_id_fk
+        GROUP BY d.id, d.district_id_fk, d.year, sc.id, sc.name, c.id, c.name, f.id, f.state_id, f.state_name
+    """
+
+
+def upgrade():
+    # Built from the data loaded so far; later finance loads must refresh it
+    # (see app/refresh_finance_summary.py, run by prestart after migrations when the data changed)
+    selects = [summary_select(kind, *tables) for kind, tables in FINANCE_FACT_TABLES.items()]
+    op.execute(f"""
+        CREATE MATERIALIZED VIEW finance_summary AS
+        {' UNION ALL '.join(selects)}
+    """)
+
+    # The unique index is what allows REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE UNIQUE INDEX unique_finance_summary_row
+        ON finance_summary(doe_form_id, kind, category_id, fund_type_id)
+    """)
+    op.execute("CREATE INDEX idx_finance_summary_district_year ON finance_summary(district_id, year)")
+    op.execute("CREATE INDEX idx_finance_summary_year ON finance_summary(year)")
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS finance_summary")
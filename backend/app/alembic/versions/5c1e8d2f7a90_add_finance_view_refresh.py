@@ -0,0 +1,39 @@
+"""Add finance view refresh state
+
+Revision ID: 5c1e8d2f7a90
+Revises: 0e0bd33d600e
+Create Date: 2026-10-18 10:04:31.552817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e8d2f7a90'
+down_revision = '0e0bd33d600e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per finance materialized view with the data versions of its source tables
+    # at its last refresh, so startup can skip refreshing views that are still current
+    # (see app/service/internal/finance_summary_service.py). Starts empty, so the first
+    # refresh after this migration always runs.
+    op.execute("""
+        CREATE TABLE finance_view_refresh (
+            id SERIAL PRIMARY KEY,
+            view_name VARCHAR(100) NOT NULL,
+            data_versions JSONB NOT NULL,
+            date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            date_updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT unique_finance_view_refresh_view_name
+                UNIQUE (view_name)
+        )
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS finance_view_refresh")
@@ -14,6 +14,8 @@ import os
 import yaml
 from datetime import datetime
 
+from app.service.internal.dataset_cache import copy_dataframe
+
 # Add this near the top of the file
 logger = logging.getLogger('alembic.runtime.migration')
 
@@ -49,110 +51,74 @@ def load_state_targets(config):
         logger.error(f"Error loading state targets data: {e}")
         raise
 
-def upgrade():
-    """Insert measurement state targets."""
-    conn = op.get_bind()
+def stage_state_targets(cursor, targets_df):
+    """
+    Copy the state targets into a temp table, dropped at commit, with each row's
+    measurement type resolved by name. Logs the names that don't match a type.
+    """
+    cursor.execute("""
+        CREATE TEMP TABLE state_target_staging (
+            position SERIAL,
+            measurement_type_name VARCHAR(255),
+            year INTEGER,
+            target_value NUMERIC(15, 2)
+        ) ON COMMIT DROP
+    """)
+    copy_dataframe(cursor, 'state_target_staging', targets_df[['measurement_type_name', 'year', 'target_value']])
     
-    # Log start of upgrade
+    cursor.execute("""
+        SELECT DISTINCT s.measurement_type_name
+        FROM state_target_staging s
+        LEFT JOIN measurement_type t ON t.name = s.measurement_type_name
+        WHERE t.id IS NULL
+        ORDER BY s.measurement_type_name
+    """)
+    for (measurement_type_name,) in cursor.fetchall():
+        logger.warning(f"Measurement type '{measurement_type_name}' not found. Skipping.")
+
+def upgrade():
+    """Upsert measurement state targets."""
     logger.info("Starting to add measurement state targets")
     
     # Load configuration and state targets data
     config = load_config()
     targets_df = load_state_targets(config)
     
-    # For each row in the dataframe
-    for _, row in targets_df.iterrows():
-        measurement_type_name = row['measurement_type_name']
-        year = row['year']
-        target_value = row['target_value']
-        
-        # Check if the measurement type exists
-        measurement_type_check = sa.text("""
-            SELECT id FROM measurement_type WHERE name = :name
-        """)
-        
-        measurement_type_id = conn.execute(
-            measurement_type_check, 
-            {"name": measurement_type_name}
-        ).scalar()
-        
-        if not measurement_type_id:
-            logger.warning(f"Measurement type '{measurement_type_name}' not found. Skipping.")
-            continue
-            
-        # Check if this target already exists to avoid duplicates
-        existing_check = sa.text("""
-            SELECT EXISTS (
-                SELECT 1 FROM measurement_state_target 
-                WHERE measurement_type_id_fk = :type_id AND year = :year
-            )
-        """)
-        
-        exists = conn.execute(
-            existing_check, 
-            {"type_id": measurement_type_id, "year": year}
-        ).scalar()
+    with op.get_bind().connection.dbapi_connection.cursor() as cursor:
+        stage_state_targets(cursor, targets_df)
         
-        if exists:
-            logger.info(f"Target for '{measurement_type_name}' in {year} already exists. Skipping.")
-            continue
-            
-        # Insert the new state target
-        insert_stmt = sa.text("""
-            INSERT INTO measurement_state_target 
-            (measurement_type_id_fk, year, field) 
-            VALUES (:type_id, :year, :value)
+        # One upsert for all targets; when the file repeats a type and year, its last row wins
+        cursor.execute("""
+            INSERT INTO measurement_state_target (measurement_type_id_fk, year, field)
+            SELECT DISTINCT ON (t.id, s.year) t.id, s.year, s.target_value
+            FROM state_target_staging s
+            JOIN measurement_type t ON t.name = s.measurement_type_name
+            ORDER BY t.id, s.year, s.position DESC
+            ON CONFLICT (measurement_type_id_fk, year) DO UPDATE
+                SET field = EXCLUDED.field, date_updated = CURRENT_TIMESTAMP
+            RETURNING (xmax = 0) AS inserted
         """)
-        
-        conn.execute(
-            insert_stmt, 
-            {"type_id": measurement_type_id, "year": year, "value": target_value}
-        )
-        
-        logger.info(f"Added state target for '{measurement_type_name}' in {year}: {target_value}")
+        results = [inserted for (inserted,) in cursor.fetchall()]
     
-    logger.info("Completed adding measurement state targets")
+    logger.info(f"Completed adding measurement state targets: {sum(results)} added, "
+                f"{len(results) - sum(results)} updated")
 
 def downgrade():
     """Remove all measurement state targets inserted by this migration."""
-    conn = op.get_bind()
-    
     logger.info("Removing measurement state targets")
     
     # Load configuration and state targets data
     config = load_config()
     targets_df = load_state_targets(config)
     
-    # For each row in the dataframe
-    for _, row in targets_df.iterrows():
-        measurement_type_name = row['measurement_type_name']
-        year = row['year']
-        
-        # Find the measurement type ID
-        measurement_type_check = sa.text("""
-            SELECT id FROM measurement_type WHERE name = :name
+    with op.get_bind().connection.dbapi_connection.cursor() as cursor:
+        stage_state_targets(cursor, targets_df)
+        cursor.execute("""
+            DELETE FROM measurement_state_target mst
+            USING state_target_staging s
+            JOIN measurement_type t ON t.name = s.measurement_type_name
+            WHERE mst.measurement_type_id_fk = t.id AND mst.year = s.year
         """)
-        
-        measurement_type_id = conn.execute(
-            measurement_type_check, 
-            {"name": measurement_type_name}
-        ).scalar()
-        
-        if not measurement_type_id:
-            logger.warning(f"Measurement type '{measurement_type_name}' not found. Skipping.")
-            continue
-            
-        # Delete the target
-        delete_stmt = sa.text("""
-            DELETE FROM measurement_state_target 
-            WHERE measurement_type_id_fk = :type_id AND year = :year
-        """)
-        
-        result = conn.execute(
-            delete_stmt, 
-            {"type_id": measurement_type_id, "year": year}
-        )
-        
-        logger.info(f"Removed {result.rowcount} state target(s) for '{measurement_type_name}' in {year}")
+        removed = cursor.rowcount
     
-    logger.info("Completed removing measurement state targets")
+    logger.info(f"Completed removing measurement state targets: {removed} removed")
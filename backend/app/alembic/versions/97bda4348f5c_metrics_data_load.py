@@ -9,10 +9,16 @@ from alembic import op
 import sqlalchemy as sa
 import pandas as pd
 import yaml
-import re
 from datetime import datetime
 import os
 import logging
+import time
+
+from app.service.internal.dataset_cache import copy_dataframe, read_datasets, write_datasets
+from app.service.internal.known_ids import drop_unknown_ids, load_known_ids
+from app.service.internal.metrics_parser import (
+    process_measurement_categories, process_measurement_types, process_measurements
+)
 
 # Add this near the top of the file
 logger = logging.getLogger('alembic.runtime.migration')
@@ -24,6 +30,9 @@ down_revision = '2aada939afdc'
 branch_labels = None
 depends_on = None
 
+# Cached datasets, in load order
+DATASETS = ['measurement_type_category', 'measurement_type', 'measurement']
+
 
 def load_config():
     """Load configuration from YAML file."""
@@ -35,186 +44,123 @@ def load_config():
     except Exception as e:
         raise Exception(f"Error loading configuration: {e}")
 
-def process_measurement_categories(df, config):
-    """Process measurement categories from DataFrame."""
-    categories = {}
-    category_column = config['column_mappings']['indicator_category']
-    
-    for category in df[category_column].dropna().unique():
-        categories[category] = {
-            'name': category,
-            'measurement_types': {}
-        }
-    
-    return categories
-
-def process_measurement_types(df, categories, config):
-    """Process measurement types and associate them with categories."""
-    measurement_types = df[[
-        config['column_mappings']['indicator_category'],
-        config['column_mappings']['indicator_name']
-    ]].dropna(subset=[config['column_mappings']['indicator_name']]).drop_duplicates()
-    
-    current_category = None
-    for _, row in measurement_types.iterrows():
-        category = row[config['column_mappings']['indicator_category']]
-        indicator = row[config['column_mappings']['indicator_name']]
-        
-        if pd.notna(category):
-            current_category = category
-        
-        if current_category is None:
-            continue
-            
-        if current_category in categories:
-            categories[current_category]['measurement_types'][indicator] = {
-                'name': indicator
-            }
-    
-    return categories
+def build_datasets(categories, measurements, config):
+    """Build the category, measurement type and measurement rows for all data.
 
-def clean_value(value, config):
-    """Clean measurement values by removing %,$, etc. and handling special values."""
-    if pd.isna(value) or value == "" or value in config['special_values']['null_values']:
-        return None
+    Measurement types and measurements refer to their category and type by name,
+    since their IDs are only known once the rows are inserted. Measurements of
+    schools and districts that don't exist are kept, they are dropped when loaded.
+    """
+    category_rows = []
+    measurement_type_rows = []
+    measurement_rows = []
     
-    value_str = str(value)
-    
-    if any(pattern in value_str for pattern in config['special_values']['skip_patterns']):
-        return None
-    
-    if value_str.startswith(">") or value_str.startswith("<"):
-        cleaned = re.sub(r'[^0-9.]', '', value_str)
-    else:
-        cleaned = re.sub(r'[^0-9.-]', '', value_str)
-    
-    return cleaned if cleaned != "" else None
-
-def process_measurements(df, config):
-    """Process measurements and organize by entity."""
-    measurements = {}
-    current_indicator = None
-    current_type = None
+    for category in categories.values():
+        category_rows.append((category['name'],))
+        for mtype in category['measurement_types'].values():
+            measurement_type_rows.append((mtype['name'], category['name']))
     
-    for _, row in df.iterrows():
-        entity_id = row.get(config['column_mappings']['entity_id'])
-        entity_type = row.get(config['column_mappings']['entity_type'])
-        indicator = row.get(config['column_mappings']['indicator_name'])
-        
-        if pd.notna(indicator):
-            current_indicator = indicator
-        if pd.notna(entity_type):
-            current_type = entity_type
-        
-        if current_indicator is None or pd.isna(entity_id) or current_type is None:
+    for entity in measurements.values():
+        entity_type = str(entity['type']).lower()
+        if entity_type not in ("school", "district"):
             continue
+        entity_id = int(float(entity['id']))
+        school_id, district_id = (entity_id, None) if entity_type == "school" else (None, entity_id)
         
-        entity_id = str(entity_id)
-        
-        if entity_id not in measurements:
-            measurements[entity_id] = {
-                'id': entity_id,
-                'name': row.get(config['column_mappings']['entity_name'], "Unknown"),
-                'type': current_type,
-                'measurements': []
-            }
-        
-        for year in config['column_mappings']['measurement_years']:
-            if year in row and not pd.isna(row[year]):
-                value = clean_value(row[year], config)
-                if value is not None:
-                    measurements[entity_id]['measurements'].append({
-                        'indicator': current_indicator,
-                        'year': year,
-                        'value': value
-                    })
+        for measurement in entity['measurements']:
+            measurement_rows.append(
+                (school_id, district_id, measurement['indicator'], int(measurement['year']), measurement['value'])
+            )
     
-    return measurements
+    measurement_df = pd.DataFrame(
+        measurement_rows, columns=['school_id_fk', 'district_id_fk', 'measurement_type', 'year', 'field']
+    ).astype({'school_id_fk': 'Int64', 'district_id_fk': 'Int64', 'measurement_type': 'string',
+              'year': 'int64', 'field': 'string'})
+    
+    # field stays the cleaned decimal text, Postgres rounds it to NUMERIC(15, 2) as before
+    return {
+        'measurement_type_category': pd.DataFrame(category_rows, columns=['name']).astype('string'),
+        'measurement_type': pd.DataFrame(
+            measurement_type_rows, columns=['name', 'category']
+        ).astype('string'),
+        'measurement': measurement_df,
+    }
+
+def insert_returning_ids(cursor, table, columns, arrays, key):
+    """Insert rows given as one array per column in one statement, in order. Returns their ids by key column."""
+    cursor.execute(
+        f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        SELECT {', '.join(columns)}
+        FROM unnest({', '.join(f'%s::{array_type}[]' for array_type, _ in arrays)})
+            WITH ORDINALITY AS t ({', '.join(columns)}, position)
+        ORDER BY position
+        RETURNING id, {key}
+        """,
+        [values for _, values in arrays]
+    )
+    return {value: row_id for row_id, value in cursor.fetchall()}
+
+def load_datasets(datasets):
+    """
+    Bulk load the datasets in the migration's transaction. Categories and measurement
+    types are inserted in file order with RETURNING, which gives the name to id maps
+    the measurements are resolved with before they are copied in with COPY.
 
-def generate_sql(categories, measurements, config):
-    """Generate SQL INSERT statements for all data."""
-    sql_statements = []
+    Measurements of schools and districts not in the database being loaded are
+    dropped first, whether the datasets were parsed or read from the cache.
+    """
+    measurement_types = datasets['measurement_type']
+    duplicates = measurement_types['name'][measurement_types['name'].duplicated()].tolist()
+    if duplicates:
+        raise Exception(f"Measurement type names must be unique to resolve measurements, duplicated: {duplicates}")
     
-    # Category inserts
-    sql_statements.append("-- Insert measurement type categories")
-    for category in categories.values():
-        sql_statements.append(
-            f"""INSERT INTO measurement_type_category (name) VALUES ('{category['name'].replace("'", "''")}');"""
+    with op.get_bind().connection.dbapi_connection.cursor() as cursor:
+        category_ids = insert_returning_ids(
+            cursor, 'measurement_type_category', ['name'],
+            [('VARCHAR', datasets['measurement_type_category']['name'].tolist())], 'name'
+        )
+        measurement_type_ids = insert_returning_ids(
+            cursor, 'measurement_type', ['name', 'measurement_type_category_id_fk'],
+            [('VARCHAR', measurement_types['name'].tolist()),
+             ('INTEGER', [category_ids[category] for category in measurement_types['category']])],
+            'name'
         )
-    
-    # Measurement type inserts
-    sql_statements.append("\n-- Insert measurement types")
-    for category in categories.values():
-        sql_statements.append(f"\n-- {category['name']}")
-        for mtype in category['measurement_types'].values():
-            sql_statements.append(
-                f"""INSERT INTO measurement_type (name, measurement_type_category_id_fk) """
-                f"""VALUES ('{mtype['name'].replace("'", "''")}', """
-                f"""(SELECT id FROM measurement_type_category WHERE name = '{category['name'].replace("'", "''")}'));"""
-            )
-    
-    # Measurement inserts
-    sql_statements.append("\n-- Insert measurements")
-    for entity in measurements.values():
-        sql_statements.append(f"\n-- Measurements for {entity['type']} '{entity['name']}' (ID: {entity['id']})")
         
-        for measurement in entity['measurements']:
-            entity_type = str(entity['type']).lower()
-            
-            if entity_type == "school":
-                school_id = int(float(entity['id']))
-                # Check if school exists using text()
-                exists_check = sa.text("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM school WHERE id = :school_id
-                    )
-                """)
-                result = op.get_bind().execute(exists_check, {"school_id": school_id}).scalar()
-                if not result:
-                    continue
-                
-                sql_statements.append(
-                    f"""INSERT INTO measurement (school_id_fk, district_id_fk, measurement_type_id_fk, year, field) """
-                    f"""VALUES ({school_id}, NULL, """
-                    f"""(SELECT id FROM measurement_type WHERE name = '{measurement['indicator'].replace("'", "''")}'), """
-                    f"""{measurement['year']}, {measurement['value']});"""
-                )
-            
-            elif entity_type == "district":
-                district_id = int(float(entity['id']))
-                # Check if district exists using text()
-                exists_check = sa.text("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM district WHERE id = :district_id
-                    )
-                """)
-                result = op.get_bind().execute(exists_check, {"district_id": district_id}).scalar()
-                if not result:
-                    continue
-                
-                sql_statements.append(
-                    f"""INSERT INTO measurement (school_id_fk, district_id_fk, measurement_type_id_fk, year, field) """
-                    f"""VALUES (NULL, {district_id}, """
-                    f"""(SELECT id FROM measurement_type WHERE name = '{measurement['indicator'].replace("'", "''")}'), """
-                    f"""{measurement['year']}, {measurement['value']});"""
-                )
-    
-    return "\n".join(sql_statements)
+        # Drop measurements of schools and districts that don't exist
+        known_ids = load_known_ids(op.get_bind())
+        measurements = drop_unknown_ids(datasets['measurement'], 'school_id_fk', known_ids.schools, 'measurement',
+                                        progress_logger=logger)
+        measurements = drop_unknown_ids(measurements, 'district_id_fk', known_ids.districts, 'measurement',
+                                        progress_logger=logger)
+        measurement_type_id = measurements['measurement_type'].map(measurement_type_ids)
+        if measurement_type_id.isna().any():
+            unknown = sorted(measurements['measurement_type'][measurement_type_id.isna()].unique())
+            raise Exception(f"Measurements refer to unknown measurement types: {unknown}")
+        
+        start = time.perf_counter()
+        rows = copy_dataframe(cursor, 'measurement', pd.DataFrame({
+            'school_id_fk': measurements['school_id_fk'],
+            'district_id_fk': measurements['district_id_fk'],
+            'measurement_type_id_fk': measurement_type_id.astype('int64'),
+            'year': measurements['year'],
+            'field': measurements['field'],
+        }))
+        elapsed = time.perf_counter() - start
+    logger.info(f"Loaded {len(category_ids)} categories, {len(measurement_type_ids)} measurement types and "
+                f"{rows} measurements ({rows / elapsed if elapsed else 0:.0f} rows/s copied)")
 
 def upgrade():
     config = load_config()
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
     try:
-        # Check for existing cache file first
-        cache_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['sql_cache_dir']))
-        cache_file = os.path.join(cache_dir, f'{revision}_cache.sql')
+        # Check for cached datasets first
+        cache_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['dataset_cache_dir']))
         
-        if os.path.exists(cache_file):
-            logger.info(f"Found existing SQL cache file at: {cache_file}")
-            with open(cache_file, 'r') as f:
-                sql_statements = f.read()
-            logger.info(f"Executing cached SQL statements ({os.path.getsize(cache_file)} bytes)")
+        datasets = read_datasets(cache_dir, revision, DATASETS)
+        if datasets is not None:
+            logger.info(f"Found cached datasets for {revision} in: {cache_dir}")
         else:
             # Process all input files
             input_files = [
@@ -257,18 +203,13 @@ def upgrade():
                     else:
                         all_measurements[entity_id]['measurements'].extend(entity_data['measurements'])
             
-            # Generate SQL with combined data
-            sql_statements = generate_sql(categories, all_measurements, config)
+            # Build the table rows with combined data
+            datasets = build_datasets(categories, all_measurements, config)
             
             # Save to cache
-            os.makedirs(cache_dir, exist_ok=True)
-            logger.info(f"Creating new SQL cache file at: {cache_file}")
-            with open(cache_file, 'w') as f:
-                f.write(sql_statements)
-            logger.info(f"Successfully created SQL cache file ({os.path.getsize(cache_file)} bytes)")
+            write_datasets(cache_dir, revision, datasets, progress_logger=logger)
         
-        # Execute SQL statements
-        op.execute(sql_statements)
+        load_datasets(datasets)
         
     except Exception as e:
         raise Exception(f"Error during migration: {e}")
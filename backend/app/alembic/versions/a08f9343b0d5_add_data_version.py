@@ -0,0 +1,88 @@
+"""Add data version markers
+
+Revision ID: a08f9343b0d5
+Revises: 65ab32afd32c
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a08f9343b0d5'
+down_revision = '65ab32afd32c'
+branch_labels = None
+depends_on = None
+
+# Tables whose writes bump each data version. The API caches derived data per
+# version, so any load (migration, bulk loader or manual SQL) invalidates it.
+DATA_VERSION_TABLES = {
+    'location': [
+        'sau', 'sau_staff', 'district', 'school', 'town', 'region', 'school_type', 'grades',
+        'school_grade_xref', 'town_served_xref', 'town_district_xref', 'district_grade_xref'
+    ],
+    'measurement': [
+        'measurement_type_category', 'measurement_type', 'measurement', 'measurement_state_target'
+    ],
+    'enrollment': [
+        'school_enrollment'
+    ],
+    'finance': [
+        'doe_form',
+        'balance_entry_super_category_type', 'balance_entry_category_type', 'balance_entry_type',
+        'balance_fund_type', 'balance_sheet',
+        'revenue_entry_super_category_type', 'revenue_entry_category_type', 'revenue_entry_type',
+        'revenue_fund_type', 'revenue',
+        'expenditure_entry_super_category_type', 'expenditure_entry_category_type', 'expenditure_entry_type',
+        'expenditure_fund_type', 'expenditure'
+    ],
+}
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE data_version (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            version BIGINT NOT NULL DEFAULT 1,
+            date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            date_updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT unique_data_version_name
+                UNIQUE (name)
+        )
+    """)
+
+    for name in DATA_VERSION_TABLES:
+        op.execute(f"INSERT INTO data_version (name) VALUES ('{name}')")
+
+    # Statement level, so a multi-row INSERT or COPY bumps the version once
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE data_version
+            SET version = version + 1, date_updated = CURRENT_TIMESTAMP
+            WHERE name = TG_ARGV[0];
+            RETURN NULL;
+        END;
+        $$ LANGUAGE 'plpgsql'
+    """)
+
+    for name, tables in DATA_VERSION_TABLES.items():
+        for table in tables:
+            op.execute(f"""
+                CREATE TRIGGER trigger_bump_{table}_data_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('{name}')
+            """)
+
+
+def downgrade():
+    for tables in DATA_VERSION_TABLES.values():
+        for table in tables:
+            op.execute(f"DROP TRIGGER IF EXISTS trigger_bump_{table}_data_version ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version() CASCADE")
+    op.execute("DROP TABLE IF EXISTS data_version")
@@ -15,12 +15,19 @@ from datetime import datetime
 import os
 import logging
 
+from app.service.internal.dataset_cache import copy_dataframe, read_datasets, write_datasets, write_rejects
+from app.service.internal.enrollment_parser import EnrollmentWorkbook, parse_enrollment_workbooks
+
 # revision identifiers, used by Alembic.
 revision = 'ad0f7f2e3016'
 down_revision = '97bda4348f5c'
 branch_labels = None
 depends_on = None
 
+# Cached datasets, named after the tables they load: the parsed rows, COPYed into a
+# staging table and checked there before they go into school_enrollment
+DATASETS = ['school_enrollment_staging']
+
 logger = logging.getLogger('alembic.runtime.migration')
 
 def load_config(config_path="app/alembic/config/generate_enrollment_config.yaml"):
@@ -28,67 +35,98 @@ def load_config(config_path="app/alembic/config/generate_enrollment_config.yaml"
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
-def parse_excel_file(df, year, config):
-    """Parse a single Excel file and return enrollment data structure."""
-    # Skip to the data rows
-    df = df.iloc[config['excel_settings']['data_start_row']:]
-    df = df.reset_index(drop=True)
-    
-    # Initialize data structure for this year
-    year_data = []
+# Columns of the reject file, one row per rejected school, grade and year
+REJECT_COLUMNS = ['school_id', 'school_name', 'year', 'grade', 'enrollment', 'reason']
+
+# Why a staged row can't be loaded, the first that applies, or NULL if it can. Of
+# rows for the same school, grade and year the first one is loaded.
+REJECT_REASON = """
+    CASE
+        WHEN s.school_id_fk IS NULL THEN 'invalid school ID'
+        WHEN school.id IS NULL THEN 'unknown school ID'
+        WHEN grades.id IS NULL THEN 'unknown grade ID'
+        WHEN school_enrollment.id IS NOT NULL THEN 'already loaded'
+        WHEN row_number() OVER (PARTITION BY s.school_id_fk, s.grade_id_fk, s.year ORDER BY s.row_no) > 1
+            THEN 'duplicate school, grade and year'
+    END
+"""
+
+def build_enrollment_dataset(all_years_data, config):
+    """
+    Build the rows to stage for the enrollment data, one per school, grade and
+    year. school_id_fk is null where the school ID isn't a number; school_id,
+    school_name and grade are kept for the reject file.
+    """
+    rows = []
     
-    # Process each row
-    for _, row in df.iterrows():
+    for school_data in all_years_data:
         try:
-            sau_num = int(row.iloc[0])
+            school_id_fk = int(school_data['school_id'])
+            school_id = str(school_id_fk)
         except (ValueError, TypeError):
-            continue
-            
-        school_data = {
-            'school_id': row.iloc[4],
-            'school_name': row.iloc[5],
-            'sau_id': row.iloc[0],
-            'sau_name': row.iloc[1],
-            'district_id': row.iloc[2],
-            'district_name': row.iloc[3],
-            'total': row.iloc[21],
-            'year': year,
-            'enrollments': {}
-        }
-        # Add enrollment for each grade
-        for grade, pos in config['excel_settings']['grade_positions'].items():
-            value = row.iloc[pos]
-            if pd.notna(value) and value > 0:
-                school_data['enrollments'][grade] = int(value)
+            school_id_fk = None
+            school_id = None if pd.isna(school_data['school_id']) else str(school_data['school_id'])
         
-        if school_data['enrollments']:
-            year_data.append(school_data)
+        for grade, enrollment in school_data['enrollments'].items():
+            grade_id = config['grade_mappings'][grade]
+            rows.append((school_id_fk, grade_id, school_data['year'], enrollment,
+                         school_id, school_data['school_name'], grade))
     
-    return year_data
+    df = pd.DataFrame(rows, columns=['school_id_fk', 'grade_id_fk', 'year', 'enrollment',
+                                     'school_id', 'school_name', 'grade'])
+    return df.astype({'school_id_fk': 'Int64', 'grade_id_fk': 'int64', 'year': 'int64', 'enrollment': 'int64',
+                      'school_id': object, 'school_name': object, 'grade': object})
 
-def generate_sql_statements(all_years_data, config):
-    """Generate SQL INSERT statements for enrollment data."""
-    sql_statements = []
-    
-    for school_data in all_years_data:
-        # Add check for valid school ID
-        school_id = int(school_data['school_id'])
-        exists_check = sa.text("""
-            SELECT EXISTS (
-                SELECT 1 FROM school WHERE id = :school_id
+def load_staged_enrollment(connection, staged):
+    """
+    COPY the staged rows into a temporary staging table, mark the ones that can't
+    be loaded with their reason, then insert the rest into school_enrollment.
+    Returns the number of rows inserted and the rejected rows as REJECT_COLUMNS.
+    """
+    with connection.connection.dbapi_connection.cursor() as cursor:
+        cursor.execute("""
+            CREATE TEMP TABLE school_enrollment_staging (
+                row_no SERIAL,
+                school_id_fk INTEGER,
+                grade_id_fk INTEGER,
+                year INTEGER,
+                enrollment INTEGER,
+                school_id TEXT,
+                school_name TEXT,
+                grade TEXT,
+                reason TEXT
+            ) ON COMMIT DROP
+        """)
+        rows = copy_dataframe(cursor, 'school_enrollment_staging', staged)
+        logger.info(f"Staged {rows} school_enrollment rows")
+
+        cursor.execute(f"""
+            WITH checked AS (
+                SELECT s.row_no, {REJECT_REASON} AS reason
+                FROM school_enrollment_staging s
+                LEFT JOIN school ON school.id = s.school_id_fk
+                LEFT JOIN grades ON grades.id = s.grade_id_fk
+                LEFT JOIN school_enrollment
+                    ON school_enrollment.school_id_fk = s.school_id_fk
+                    AND school_enrollment.grade_id_fk = s.grade_id_fk
+                    AND school_enrollment.year = s.year
             )
+            UPDATE school_enrollment_staging s SET reason = checked.reason
+            FROM checked
+            WHERE s.row_no = checked.row_no AND checked.reason IS NOT NULL
         """)
-        result = op.get_bind().execute(exists_check, {"school_id": school_id}).scalar()
-        
-        if not result:
-            logger.error(f"School ID {school_id} does not exist")
-            continue
-            
-        for grade, enrollment in school_data['enrollments'].items():
-            grade_id = config['grade_mappings'][grade]
-            sql_statements.append(f"""INSERT INTO school_enrollment (school_id_fk, grade_id_fk, year, enrollment) VALUES  ({school_id}, {grade_id}, {school_data['year']}, {enrollment})""")
-    
-    return sql_statements
+        cursor.execute(f"""
+            SELECT {', '.join(REJECT_COLUMNS)} FROM school_enrollment_staging
+            WHERE reason IS NOT NULL ORDER BY row_no
+        """)
+        rejects = pd.DataFrame(cursor.fetchall(), columns=REJECT_COLUMNS)
+
+        cursor.execute("""
+            INSERT INTO school_enrollment (school_id_fk, grade_id_fk, year, enrollment)
+            SELECT school_id_fk, grade_id_fk, year, enrollment FROM school_enrollment_staging
+            WHERE reason IS NULL ORDER BY row_no
+        """)
+        return cursor.rowcount, rejects
 
 def upgrade():
     # Load configuration
@@ -97,57 +135,48 @@ def upgrade():
     logger.info(f"Starting enrollment data migration")
 
     try:
-        # Check for existing cache file
-        cache_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['sql_cache_dir']))
-        cache_file = os.path.join(cache_dir, f'{revision}_cache.sql')
+        # Check for cached datasets
+        cache_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['dataset_cache_dir']))
         
         logger.info(f"Loading File")
-        if os.path.exists(cache_file):
-            logger.info(f"Found existing SQL cache file at: {cache_file}")
-            with open(cache_file, 'r') as f:
-                sql_statements = f.read().split(';')
+        datasets = read_datasets(cache_dir, revision, DATASETS)
+        if datasets is not None:
+            logger.info(f"Found cached datasets for {revision} in: {cache_dir}")
         else:
             logger.info(f"Processing File")
             
-            # Process enrollment data
+            # Parse the yearly workbooks in parallel
             generic_file_path = config['file_settings']['default_input']
             year_start = int(config['file_settings']['year_start'])
             year_end = int(config['file_settings']['year_end'])
             
-            all_years_data = []
+            workbooks = [
+                EnrollmentWorkbook(year=year, full_path=os.path.abspath(os.path.join(
+                    current_dir, generic_file_path.replace('****', str(year))
+                )))
+                for year in range(year_start, year_end + 1)
+            ]
+            workers = config['file_settings'].get('parse_workers', 0)
             
-            # Iterate through the years
-            for year in range(year_start, year_end + 1):
-                current_file = generic_file_path.replace('****', str(year))
-                try:
-                    file_path = os.path.abspath(os.path.join(current_dir,current_file))
-                    df = pd.read_excel(file_path)
-                    year_data = parse_excel_file(df, year, config)
-                    all_years_data.extend(year_data)
-                except Exception as e:
-                    logger.error(f"Error processing file for year {year}: {e}")
+            all_years_data = []
+            for workbook in parse_enrollment_workbooks(workbooks, config, workers, progress_logger=logger):
+                if workbook.error:
+                    logger.error(f"Error processing file for year {workbook.year}: {workbook.error}")
                     continue
+                all_years_data.extend(workbook.schools)
             
-            # Generate SQL statements
-            sql_statements = generate_sql_statements(all_years_data, config)
-            logger.info(f"Generating SQL Statements")
+            # Build the rows to stage, they are checked against the database when loaded
+            datasets = {'school_enrollment_staging': build_enrollment_dataset(all_years_data, config)}
+            logger.info(f"Built {len(datasets['school_enrollment_staging'])} enrollment rows")
 
             # Save to cache
-            os.makedirs(cache_dir, exist_ok=True)
-            logger.info(f"Creating new SQL cache file at: {cache_file}")
-            with open(cache_file, 'w') as f:
-                f.write(';\n'.join(sql_statements))
-            logger.info(f"Successfully created SQL cache file ({os.path.getsize(cache_file)} bytes)")
+            write_datasets(cache_dir, revision, datasets, progress_logger=logger)
         
-        # Execute SQL statements individually
-        for statement in sql_statements:
-            statement = statement.strip()
-            if statement:  # Skip empty statements
-                try:
-                    op.execute(sa.text(statement))
-                except Exception as e:
-                    logger.error(f"Error executing SQL statement: {e}\nStatement: {statement}")
-                    continue
+        # Stage and load in the migration's transaction, rejected rows go to the reject file
+        rows, rejects = load_staged_enrollment(op.get_bind(), datasets['school_enrollment_staging'])
+        logger.info(f"Loaded {rows} school_enrollment rows")
+        reject_dir = os.path.abspath(os.path.join(current_dir, config['file_settings']['reject_dir']))
+        write_rejects(reject_dir, revision, 'school_enrollment', rejects, progress_logger=logger)
                 
     except Exception as e:
         logger.error(f"Error during migration: {e}")
@@ -0,0 +1,64 @@
+"""Add finance per pupil materialized view
+
+Revision ID: b73622d2d879
+Revises: 450666bef978
+Create Date: 2026-10-17 13:41:08.904173
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b73622d2d879'
+down_revision = '450666bef978'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built on finance_summary, so it must be refreshed after it
+    # (see app/service/internal/finance_summary_service.py)
+    op.execute("""
+        CREATE MATERIALIZED VIEW finance_per_pupil AS
+        WITH finance AS (
+            SELECT
+                district_id,
+                year,
+                COALESCE(SUM(total) FILTER (WHERE kind = 'revenues'), 0) AS total_revenue,
+                COALESCE(SUM(total) FILTER (WHERE kind = 'expenditures'), 0) AS total_expenditure
+            FROM finance_summary
+            GROUP BY district_id, year
+        ),
+        enrollment AS (
+            SELECT
+                s.district_id_fk AS district_id,
+                se.year,
+                SUM(se.enrollment) AS enrollment
+            FROM school_enrollment se
+            JOIN school s ON s.id = se.school_id_fk
+            WHERE s.district_id_fk IS NOT NULL
+            GROUP BY s.district_id_fk, se.year
+        )
+        SELECT
+            f.district_id,
+            f.year,
+            f.total_revenue,
+            f.total_expenditure,
+            e.enrollment,
+            ROUND(f.total_revenue / NULLIF(e.enrollment, 0), 2) AS revenue_per_pupil,
+            ROUND(f.total_expenditure / NULLIF(e.enrollment, 0), 2) AS expenditure_per_pupil
+        FROM finance f
+        LEFT JOIN enrollment e
+            ON e.district_id = f.district_id
+            AND e.year = f.year
+    """)
+
+    # The unique index is what allows REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX unique_finance_per_pupil_district_year ON finance_per_pupil(district_id, year)")
+    op.execute("CREATE INDEX idx_finance_per_pupil_year ON finance_per_pupil(year)")
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS finance_per_pupil")
@@ -0,0 +1,62 @@
+"""Seed finance ingest manifest
+
+Revision ID: e41f6b0c93d2
+Revises: 5c1e8d2f7a90
+Create Date: 2026-10-18 14:37:09.481262
+
+"""
+import logging
+import os
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from app.service.internal.doe_form_parser import doe_form_file_name, file_digest
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# revision identifiers, used by Alembic.
+revision = 'e41f6b0c93d2'
+down_revision = '5c1e8d2f7a90'
+branch_labels = None
+depends_on = None
+
+ASSETS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../assets/finance'))
+
+
+def upgrade():
+    # A manifest entry for every workbook migration 21ea12af9faf loaded, so the first
+    # app/ingest_finance.py run only parses workbooks added or changed since instead of
+    # all of them. Entries an ingest run already wrote are kept.
+    connection = op.get_bind()
+    loaded = connection.execute(sa.text("""
+        SELECT DISTINCT f.district_id_fk, f.year, d.name
+        FROM doe_form f
+        JOIN district d ON d.id = f.district_id_fk
+        ORDER BY f.year, f.district_id_fk
+    """)).all()
+
+    entries = []
+    for district_id, year, district_name in loaded:
+        file_path = os.path.join(str(year), doe_form_file_name(district_name, year))
+        full_path = os.path.join(ASSETS_DIR, file_path)
+        if os.path.exists(full_path):
+            size, sha256 = file_digest(full_path)
+            entries.append({'file_path': file_path, 'district_id_fk': district_id, 'year': year,
+                            'size': size, 'sha256': sha256})
+
+    seeded = 0
+    if entries:
+        seeded = connection.execute(sa.text("""
+            INSERT INTO finance_ingest_manifest (file_path, district_id_fk, year, size, sha256, status)
+            VALUES (:file_path, :district_id_fk, :year, :size, :sha256, 'loaded')
+            ON CONFLICT (file_path) DO NOTHING
+        """), entries).rowcount
+    logger.info(f"Seeded the finance ingest manifest with {seeded} of {len(loaded)} loaded DOE-25 workbooks")
+
+
+def downgrade():
+    # Seeded entries look the same as the ones ingest runs write, so they stay;
+    # downgrading 0e0bd33d600e drops the table
+    pass
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Query
 from typing import List, Optional
 
-from app.api.v1.deps import SessionDep
+from app.api.v1.deps import AsyncSessionDep
 from app.schema.enrollment_schema import SchoolEnrollmentGet
 from app.service.public.enrollment_service import enrollment_service
 
@@ -12,9 +12,9 @@ router = APIRouter()
     summary="Get school enrollments",
     description="Retrieves enrollment data for a specific school, with optional filtering by year",
     response_description="List of school enrollments")
-def get_school_enrollments(
+async def get_school_enrollments(
     school_id: int, 
-    session: SessionDep,
+    session: AsyncSessionDep,
     year: Optional[int] = Query(None, description="Filter enrollments by year")
 ):
     """
@@ -26,7 +26,7 @@ def get_school_enrollments(
     
     Returns a list of enrollment records with grade information.
     """
-    return enrollment_service.get_school_enrollments(
+    return await enrollment_service.get_school_enrollments(
         session=session, 
         school_id=school_id, 
         year=year
@@ -37,9 +37,9 @@ def get_school_enrollments(
     summary="Get latest school enrollments",
     description="Retrieves the most recent enrollment data available for a specific school",
     response_description="List of latest school enrollments")
-def get_latest_school_enrollments(
+async def get_latest_school_enrollments(
     school_id: int, 
-    session: SessionDep
+    session: AsyncSessionDep
 ):
     """
     Get the most recent enrollment data available for a specific school.
@@ -52,7 +52,7 @@ def get_latest_school_enrollments(
     
     Returns a list of the most recent enrollment records with grade information.
     """
-    return enrollment_service.get_latest_school_enrollments(
+    return await enrollment_service.get_latest_school_enrollments(
         session=session, 
         school_id=school_id
     )
@@ -1,23 +1,43 @@
+import json
+import logging
+
 from fastapi import APIRouter, Query, Path, HTTPException
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 
-from app.api.v1.deps import SessionDep
+from app.api.v1.deps import AsyncSessionDep
 from app.schema.finance_schema import (
     DOEFormGet, BalanceSheetGet, RevenueGet, ExpenditureGet,
-    FinancialReportGet, AllEntryTypesGet, AllFundTypesGet
+    FinancialReportGet, FinancialReportRangeGet, FinancialSummaryGet, FinancePerPupilGet,
+    AllEntryTypesGet, AllFundTypesGet
 )
 from app.service.public.finance_service import finance_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+async def _ndjson(reports: AsyncIterator[FinancialReportGet]) -> AsyncIterator[str]:
+    """
+    Serialize reports as newline-delimited JSON, one report per line. An error after
+    the response has started ends the stream with a {"detail": ...} line, the same
+    body the app returns for an unhandled error.
+    """
+    try:
+        async for report in reports:
+            yield report.model_dump_json(by_alias=True) + "\n"
+    except Exception:
+        logger.exception("Financial report stream failed")
+        yield json.dumps({"detail": "Internal server error"}) + "\n"
+
 @router.get("/report", 
     response_model=FinancialReportGet,
     summary="Get financial report",
     description="Retrieves a comprehensive financial report for a specific district and year, including DOE form data and all related financial data.",
     response_description="Financial report with DOE form and related financial data")
-def get_financial_report(
-    session: SessionDep,
+async def get_financial_report(
+    session: AsyncSessionDep,
     district_id: int = Query(..., description="District ID"),
     year: int = Query(..., description="Year of the financial report")
 ):
@@ -32,7 +52,121 @@ def get_financial_report(
     
     All related data is included with appropriate details.
     """
-    return finance_service.get_financial_report(
+    return await finance_service.get_financial_report(
+        session=session,
+        district_id=district_id,
+        year=year
+    )
+
+@router.get("/report/range",
+    response_model=FinancialReportRangeGet,
+    summary="Get financial reports for a range of years",
+    description="Retrieves the financial reports for a specific district for every year in a range, keyed by year.",
+    response_description="Financial reports for the district, keyed by year")
+async def get_financial_report_range(
+    session: AsyncSessionDep,
+    district_id: int = Query(..., description="District ID"),
+    start_year: int = Query(..., description="First year of the range (inclusive)"),
+    end_year: int = Query(..., description="Last year of the range (inclusive)")
+):
+    """
+    Get the financial reports for a specific district for every year from start_year
+    to end_year. Years without a DOE form are left out.
+    
+    Each report has the same shape as /report.
+    """
+    return await finance_service.get_financial_report_range(
+        session=session,
+        district_id=district_id,
+        start_year=start_year,
+        end_year=end_year
+    )
+
+@router.get("/report/batch",
+    response_class=StreamingResponse,
+    summary="Get financial reports for many districts",
+    description="Retrieves the financial reports of many districts (all by default) for one year. The response is streamed as newline-delimited JSON.",
+    response_description="Financial reports as newline-delimited JSON, one line per district with a DOE form for the year")
+async def get_financial_report_batch(
+    year: int = Query(..., description="Year of the financial reports"),
+    district_id: Optional[List[int]] = Query(None, description="District IDs, may be repeated. Omit for all districts")
+):
+    """
+    Get the financial reports of many districts for a specific year.
+    
+    Each line is a report with the same shape as /report. Districts without a DOE form
+    for the year are left out, and a year without any is a 404. Reports are streamed in
+    batches as they are read from the database; if reading a later batch fails, the
+    stream ends with a {"detail": ...} line instead of a report.
+    """
+    reports = await finance_service.stream_financial_reports(year=year, district_ids=district_id)
+    return StreamingResponse(_ndjson(reports), media_type="application/x-ndjson")
+
+@router.get("/report/summary",
+    response_model=FinancialSummaryGet,
+    summary="Get financial report totals",
+    description="Retrieves the balance sheet, revenue and expenditure totals of a district's financial report for a year, by category, super category and fund.",
+    response_description="Financial totals by category, super category and fund, with grand totals")
+async def get_financial_summary(
+    session: AsyncSessionDep,
+    district_id: int = Query(..., description="District ID"),
+    year: int = Query(..., description="Year of the financial report")
+):
+    """
+    Get the totals of a district's financial report for a specific year.
+    
+    For each of balance sheets, revenues and expenditures this includes:
+    - Totals per entry category
+    - Totals per entry super category
+    - Totals per fund type
+    - The grand total
+    
+    Totals are computed in the database, so clients don't need the individual rows.
+    """
+    return await finance_service.get_financial_summary(
+        session=session,
+        district_id=district_id,
+        year=year
+    )
+
+@router.get("/comparison",
+    response_model=List[FinancialSummaryGet],
+    summary="Compare financial totals across districts",
+    description="Retrieves the financial report totals of many districts (all by default) for one year, by category, super category and fund.",
+    response_description="Financial totals, one entry per district with a DOE form for the year")
+async def get_financial_comparison(
+    session: AsyncSessionDep,
+    year: int = Query(..., description="Year of the financial reports"),
+    district_id: Optional[List[int]] = Query(None, description="District IDs, may be repeated. Omit for all districts")
+):
+    """
+    Get the totals of many districts' financial reports for a specific year.
+    
+    Each entry has the same shape as /report/summary, ordered by district.
+    """
+    return await finance_service.get_financial_comparison(
+        session=session,
+        year=year,
+        district_ids=district_id
+    )
+
+@router.get("/per-pupil",
+    response_model=List[FinancePerPupilGet],
+    summary="Get per pupil revenue and expenditure",
+    description="Retrieves per pupil revenue and expenditure for a district (all years), a year (all districts) or a district and year.",
+    response_description="Per pupil revenue and expenditure by district and year")
+async def get_per_pupil(
+    session: AsyncSessionDep,
+    district_id: Optional[int] = Query(None, description="District ID"),
+    year: Optional[int] = Query(None, description="Year")
+):
+    """
+    Get per pupil revenue and expenditure. At least one of district_id and year is required.
+    
+    Per pupil amounts are the district's total revenue and expenditure divided by the
+    summed enrollment of its schools for the year, and are null when no enrollment is on file.
+    """
+    return await finance_service.get_per_pupil(
         session=session,
         district_id=district_id,
         year=year
@@ -43,8 +177,8 @@ def get_financial_report(
     summary="Get all entry types",
     description="Retrieves all entry types (balance, revenue, expenditure) with their categories and super categories.",
     response_description="All entry types with categories and super categories")
-def get_all_entry_types(
-    session: SessionDep
+async def get_all_entry_types(
+    session: AsyncSessionDep
 ):
     """
     Get all entry types (balance, revenue, expenditure) with their categories and super categories.
@@ -54,15 +188,15 @@ def get_all_entry_types(
     - Revenue entry types with their categories and super categories
     - Expenditure entry types with their categories and super categories
     """
-    return finance_service.get_all_entry_types(session=session)
+    return await finance_service.get_all_entry_types(session=session)
 
 @router.get("/fund-types",
     response_model=AllFundTypesGet,
     summary="Get all fund types",
     description="Retrieves all fund types (balance, revenue, expenditure).",
     response_description="All fund types")
-def get_all_fund_types(
-    session: SessionDep
+async def get_all_fund_types(
+    session: AsyncSessionDep
 ):
     """
     Get all fund types (balance, revenue, expenditure).
@@ -72,4 +206,4 @@ def get_all_fund_types(
     - Revenue fund types
     - Expenditure fund types
     """
-    return finance_service.get_all_fund_types(session=session) 
\ No newline at end of file
+    return await finance_service.get_all_fund_types(session=session) 
\ No newline at end of file
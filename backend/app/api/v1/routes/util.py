@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from app.core.db import async_engine, pool_stats
+from app.core.utils.cache import cache_stats
+
 router = APIRouter()
 
 @router.get("/health-check",
@@ -7,4 +10,18 @@ router = APIRouter()
     description="Simple endpoint to verify API is running",
     response_description="Status indicating API health")
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/pool-stats",
+    summary="Database pool statistics",
+    description="Internal endpoint reporting live connection pool usage for the worker that serves the request",
+    response_description="Pool size, checked out and overflow connections, checkout wait time histogram, timeouts and connect time")
+async def get_pool_stats():
+    return pool_stats.snapshot(async_engine.pool)
+
+@router.get("/cache-stats",
+    summary="Response cache statistics",
+    description="Internal endpoint reporting hit/miss counters of the in-process reference data caches for the worker that serves the request",
+    response_description="Size, hits, misses and evictions per cache")
+async def get_cache_stats():
+    return cache_stats()
\ No newline at end of file
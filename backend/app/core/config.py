@@ -60,6 +60,25 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool settings apply per uvicorn worker. heroku-postgresql:essential-1 allows
+    # 20 connections; 4 workers x (3 + 1) = 16 leaves 4 for what runs next to uvicorn
+    # (alembic and refresh_finance_summary in start-heroku.sh, ingest_finance, psql).
+    DB_POOL_SIZE: int = 3
+    DB_MAX_OVERFLOW: int = 1
+    DB_POOL_TIMEOUT: int = 10  # seconds to wait for a free connection before erroring
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 3  # connections opened at startup, capped at DB_POOL_SIZE
+
+    # In-process cache for reference data (grades, regions, types...) that only changes with data migrations
+    REFERENCE_CACHE_TTL: int = 60 * 60
+    REFERENCE_CACHE_MAXSIZE: int = 256
+    # How often the data_version table is re-read to detect data loads
+    DATA_VERSION_CHECK_INTERVAL: int = 30
+    # DOE forms read per query when streaming batch finance reports; each batch uses its own
+    # short-lived session, so no connection is held while the client reads the stream
+    FINANCE_STREAM_BATCH_FORMS: int = 50
+
     SMTP_HOST: str = "smtp.gmail.com"  # Default to Gmail SMTP
     SMTP_PORT: int = 587
     SMTP_USER: str
@@ -0,0 +1,41 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.model.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+# Last versions read from the data_version table, shared by every request in this worker
+_versions: Dict[str, int] = {}
+_checked_at: float = 0.0
+
+
+async def get_data_version(session: AsyncSession, name: str) -> Optional[int]:
+    """
+    Get the current version of a dataset ('location', 'measurement', 'enrollment', 'finance').
+
+    The versions are bumped by database triggers whenever the dataset's tables
+    change. All versions are read in one query and reused for
+    DATA_VERSION_CHECK_INTERVAL seconds. Returns None when the versions can't
+    be read (e.g. while migrations are still running), in which case callers
+    should not cache anything.
+    """
+    global _versions, _checked_at
+
+    if time.monotonic() - _checked_at >= settings.DATA_VERSION_CHECK_INTERVAL:
+        try:
+            rows = (await session.exec(select(DataVersion.name, DataVersion.version))).all()
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not read data versions: {e}")
+            await session.rollback()
+            return None
+        _versions = {row_name: version for row_name, version in rows}
+        _checked_at = time.monotonic()
+
+    return _versions.get(name)
@@ -1,5 +1,173 @@
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel import create_engine
 
 from app.core.config import settings
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """
+    Counts pool checkouts and buckets how long each one waited for a connection.
+    Checkouts that timed out and the time spent opening new connections are counted
+    separately, so the wait histogram only holds time spent queueing for the pool.
+    """
+
+    # Upper bounds of the wait time histogram buckets, in milliseconds
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._connects = 0
+        self._total_connect_ms = 0.0
+        self._max_connect_ms = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS_MS, wait_ms)] += 1
+            self._checkouts += 1
+            self._total_wait_ms += wait_ms
+            self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def observe_connect(self, seconds: float) -> None:
+        connect_ms = seconds * 1000
+        with self._lock:
+            self._connects += 1
+            self._total_connect_ms += connect_ms
+            self._max_connect_ms = max(self._max_connect_ms, connect_ms)
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            histogram = {f"<={bound}ms": count for bound, count in zip(self.BUCKETS_MS, self._counts)}
+            histogram[f">{self.BUCKETS_MS[-1]}ms"] = self._counts[-1]
+            return {
+                "pid": os.getpid(),
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_ms": {
+                    "avg": self._total_wait_ms / self._checkouts if self._checkouts else 0.0,
+                    "max": self._max_wait_ms,
+                    "histogram": histogram,
+                },
+                "connects": self._connects,
+                "connect_ms": {
+                    "avg": self._total_connect_ms / self._connects if self._connects else 0.0,
+                    "max": self._max_connect_ms,
+                },
+            }
+
+
+pool_stats = PoolStats()
+
+# How deep the current checkout is in _do_get; QueuePool._do_get retries by calling itself
+_do_get_depth: ContextVar[int] = ContextVar("pool_do_get_depth", default=0)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records checkout wait time, timeouts and connect time in
+    pool_stats.
+
+    QueuePool opens overflow connections inside _do_get, so the time spent in
+    _create_connection is recorded as connect time and left out of the wait.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Connect time of records opened by _create_connection, until their checkout is recorded
+        self._connect_seconds: Dict[Any, float] = {}
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        seconds = time.perf_counter() - start
+        pool_stats.observe_connect(seconds)
+        self._connect_seconds[record] = seconds
+        return record
+
+    def _do_get(self):
+        depth = _do_get_depth.get()
+        token = _do_get_depth.set(depth + 1)
+        try:
+            # Only the outermost call of a checkout records, not its retries
+            if depth:
+                return super()._do_get()
+
+            start = time.perf_counter()
+            try:
+                record = super()._do_get()
+            except exc.TimeoutError:
+                pool_stats.observe_timeout()
+                raise
+            connect_seconds = self._connect_seconds.pop(record, 0.0)
+            pool_stats.observe_wait(max(time.perf_counter() - start - connect_seconds, 0.0))
+            return record
+        finally:
+            _do_get_depth.reset(token)
+
+
+def _pool_settings() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Blocking engine, used by startup checks and scripts that run outside the event loop
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **_pool_settings())
+
+# Async engine (psycopg3 async driver), used by the API request path
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    **_pool_settings()
+)
+
+
+async def warm_up_pool(connections: int = settings.DB_POOL_WARMUP) -> None:
+    """Open pooled connections up front so the first requests don't pay connect latency."""
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+
+    start = time.perf_counter()
+    try:
+        # Hold every connection open at once, otherwise the pool would hand back the same one
+        async with AsyncExitStack() as stack:
+            await asyncio.gather(*(
+                stack.enter_async_context(async_engine.connect()) for _ in range(connections)
+            ))
+    except Exception as e:
+        logger.warning(f"Connection pool warm-up failed, continuing without it: {e}")
+        return
+    logger.info(f"Warmed up {connections} pooled connections in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,142 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.data_version import get_data_version
+
+# Every cache created by the decorator, by name, so stats and invalidation can reach all of them
+_caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a fixed time to live.
+
+    Values are returned as stored, so callers must treat them as read-only.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.data_version: Optional[int] = None
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (True, value) on a live hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "data_version": self.data_version,
+            }
+
+
+def cached(
+    name: str,
+    maxsize: int = 128,
+    ttl: float = 3600,
+    ignore: Tuple[str, ...] = ("self", "session"),
+    data_version: Optional[str] = None
+):
+    """
+    Decorator that caches the result of an async service method.
+
+    The cache key is built from the call's bound arguments, so each distinct
+    filter value gets its own entry. The session (and self) are left out of the key.
+
+    With data_version set, entries are only valid for the current version of that
+    dataset: the cache is cleared as soon as the version changes, and nothing is
+    cached while the version can't be read.
+
+    Args:
+        name: Unique cache name, used in stats
+        maxsize: Maximum number of entries kept, least recently used are evicted first
+        ttl: Seconds an entry stays valid
+        ignore: Argument names excluded from the cache key
+        data_version: Dataset name in the data_version table the cached data derives from
+    """
+    def decorator(func: Callable):
+        if name in _caches:
+            raise ValueError(f"Cache '{name}' is already registered")
+        cache = TTLCache(name, maxsize, ttl)
+        _caches[name] = cache
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                (arg_name, value) for arg_name, value in bound.arguments.items()
+                if arg_name not in ignore
+            )
+            if data_version is not None:
+                version = await get_data_version(bound.arguments["session"], data_version)
+                if version is None:
+                    return await func(*args, **kwargs)
+                if version != cache.data_version:
+                    cache.invalidate()
+                    cache.data_version = version
+
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = await func(*args, **kwargs)
+            cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.invalidate = cache.invalidate
+        return wrapper
+    return decorator
+
+
+def invalidate_all() -> None:
+    """Clear every registered cache, e.g. after a data load."""
+    for cache in _caches.values():
+        cache.invalidate()
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    return [cache.stats() for cache in _caches.values()]
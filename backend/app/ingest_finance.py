@@ -0,0 +1,124 @@
+import argparse
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.model.finance import FinanceIngestManifest
+from app.model.location import District
+from app.service.internal.doe_form_parser import DOEFormJob, doe_form_file_name, file_digest, parse_doe_forms
+from app.service.internal.finance_loader import delete_doe_forms, load_doe_forms
+from app.service.internal.finance_summary_service import refresh_finance_views
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic')
+ASSETS_DIR = os.path.join(ALEMBIC_DIR, 'assets', 'finance')
+CONFIG_PATH = os.path.join(ALEMBIC_DIR, 'config', 'generate_finance_config.yaml')
+
+
+def find_workbooks(session: Session, years: List[int]) -> List[DOEFormJob]:
+    """A job for every district workbook on disk for the given years."""
+    districts = session.exec(select(District.id, District.name).order_by(District.id)).all()
+    jobs = []
+    for year in years:
+        for district_id, district_name in districts:
+            full_path = os.path.join(ASSETS_DIR, str(year), doe_form_file_name(district_name, year))
+            if os.path.exists(full_path):
+                jobs.append(DOEFormJob(full_path=full_path, year=year, district_id=district_id,
+                                       district_name=district_name))
+    return jobs
+
+
+def find_removed(
+    manifest: Dict[str, FinanceIngestManifest],
+    years: Optional[List[int]]
+) -> List[FinanceIngestManifest]:
+    """Manifest entries of the given years (all years if None) whose workbook is no longer on disk."""
+    return [
+        entry for file_path, entry in manifest.items()
+        if (years is None or entry.year in years) and not os.path.exists(os.path.join(ASSETS_DIR, file_path))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load DOE-25 workbooks from assets/finance that are new or changed since the last run, "
+                    "and unload the ones that were deleted"
+    )
+    parser.add_argument("--year", type=int, action="append",
+                        help="Only look at this year, may be repeated (default: every year directory)")
+    parser.add_argument("--force", action="store_true", help="Reload workbooks even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be loaded")
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+    years = args.year or sorted(int(name) for name in os.listdir(ASSETS_DIR) if name.isdigit())
+
+    with Session(engine) as session:
+        jobs = find_workbooks(session, years)
+        manifest = {entry.file_path: entry for entry in session.exec(select(FinanceIngestManifest)).all()}
+
+        # Hash every workbook, keep the ones whose content isn't loaded yet: new, changed,
+        # or failed last time (their previous forms, if any, are still the loaded ones)
+        digests: Dict[str, Tuple[int, str]] = {}
+        changed = []
+        for job in jobs:
+            file_path = os.path.relpath(job.full_path, ASSETS_DIR)
+            digests[file_path] = file_digest(job.full_path)
+            entry = manifest.get(file_path)
+            if (args.force or entry is None or entry.status != 'loaded'
+                    or (entry.size, entry.sha256) != digests[file_path]):
+                changed.append(job)
+
+        # Workbooks loaded before but deleted since: their district-years are unloaded,
+        # unless another workbook on disk is loaded for the same district and year
+        removed = find_removed(manifest, args.year)
+        loaded_district_years = {(job.district_id, job.year) for job in jobs}
+        unload = sorted({(entry.district_id_fk, entry.year) for entry in removed} - loaded_district_years)
+
+        logger.info(f"{len(changed)} of {len(jobs)} DOE-25 workbooks are new, changed or failed last time, "
+                    f"{len(removed)} were deleted")
+        for job in changed:
+            logger.info(f"  {os.path.relpath(job.full_path, ASSETS_DIR)}")
+        for entry in removed:
+            logger.info(f"  {entry.file_path} (deleted)")
+        if args.dry_run or not (changed or removed):
+            return
+
+        results = parse_doe_forms(changed, config, config['file_settings'].get('parse_workers', 0)) if changed else []
+        forms = [result.data for result in results if result.status == 'parsed']
+
+        # Unloaded forms, loaded forms, facts and manifest in one transaction
+        unloaded = delete_doe_forms(session.connection(), unload)
+        for entry in removed:
+            session.delete(entry)
+        load_doe_forms(session.connection(), forms, replace=True)
+        for result in results:
+            file_path = os.path.relpath(result.job.full_path, ASSETS_DIR)
+            entry = manifest.get(file_path) or FinanceIngestManifest(file_path=file_path)
+            entry.district_id_fk = result.job.district_id
+            entry.year = result.job.year
+            entry.size, entry.sha256 = digests[file_path]
+            entry.status = 'loaded' if result.status == 'parsed' else result.status
+            entry.error = result.error
+            session.add(entry)
+        session.commit()
+
+    failed = [result for result in results if result.status != 'parsed']
+    logger.info(f"Loaded {len(forms)} DOE-25 workbooks, {len(failed)} failed, unloaded {unloaded} deleted ones")
+    for result in failed:
+        logger.warning(f"Failed {os.path.relpath(result.job.full_path, ASSETS_DIR)}: {result.error}")
+
+    if forms or unloaded:
+        with engine.begin() as connection:
+            refresh_finance_views(connection)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,18 +21,32 @@ logger = logging.getLogger(__name__)
 # Log application startup
 logger.info("Starting application...")
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.v1.main import api_router
 from app.core.config import settings
+from app.core.db import async_engine, warm_up_pool
+from app.service.internal.location_snapshot import location_snapshot
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_pool()
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        await location_snapshot.load(session)
+    yield
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -0,0 +1,8 @@
+from sqlmodel import Field
+from .base import BaseMixin
+
+class DataVersion(BaseMixin, table=True):
+    __tablename__ = "data_version"
+    
+    name: str = Field(max_length=50, unique=True)
+    version: int = Field(default=1)
@@ -150,4 +150,16 @@ class Expenditure(BaseMixin, table=True):
     
     doe_form: DOEForm = Relationship(back_populates="expenditures")
     entry_type: ExpenditureEntryType = Relationship(back_populates="expenditures")
-    fund_type: ExpenditureFundType = Relationship(back_populates="expenditures") 
\ No newline at end of file
+    fund_type: ExpenditureFundType = Relationship(back_populates="expenditures") 
+
+# Ingestion bookkeeping
+class FinanceIngestManifest(BaseMixin, table=True):
+    __tablename__ = "finance_ingest_manifest"
+    
+    file_path: str = Field(max_length=500, unique=True)
+    district_id_fk: int = Field(foreign_key="district.id")
+    year: int
+    size: int
+    sha256: str = Field(max_length=64)
+    status: str = Field(max_length=20)
+    error: Optional[str] = None
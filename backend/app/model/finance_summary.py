@@ -0,0 +1,36 @@
+from sqlalchemy import Float, Integer, String, column, table
+
+# Materialized views over the finance tables. They're lightweight table constructs
+# rather than SQLModel tables so they stay out of the metadata alembic manages.
+
+# Created by migration 450666bef978, one row per DOE form, report field (kind),
+# entry category and fund type
+finance_summary = table(
+    "finance_summary",
+    column("district_id", Integer),
+    column("year", Integer),
+    column("doe_form_id", Integer),
+    column("kind", String),
+    column("super_category_id", Integer),
+    column("super_category_name", String),
+    column("category_id", Integer),
+    column("category_name", String),
+    column("fund_type_id", Integer),
+    column("fund_state_id", String),
+    column("fund_state_name", String),
+    column("total", Float),
+    column("row_count", Integer),
+)
+
+# Created by migration b73622d2d879, one row per district and year with a DOE form;
+# enrollment and the per pupil amounts are null when the district has no enrollment
+finance_per_pupil = table(
+    "finance_per_pupil",
+    column("district_id", Integer),
+    column("year", Integer),
+    column("total_revenue", Float),
+    column("total_expenditure", Float),
+    column("enrollment", Integer),
+    column("revenue_per_pupil", Float),
+    column("expenditure_per_pupil", Float),
+)
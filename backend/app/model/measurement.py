@@ -1,4 +1,5 @@
 from typing import Optional, List
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, Relationship
 from .base import BaseMixin
 from .location import School, District
@@ -33,6 +34,10 @@ class Measurement(BaseMixin, table=True):
 
 class MeasurementStateTarget(BaseMixin, table=True):
     __tablename__ = "measurement_state_target"
+    __table_args__ = (
+        # Backs the state target loader's ON CONFLICT upsert
+        UniqueConstraint("measurement_type_id_fk", "year", name="unique_measurement_state_target_year"),
+    )
     
     measurement_type_id_fk: int = Field(foreign_key="measurement_type.id")
     year: int
@@ -0,0 +1,29 @@
+import argparse
+import logging
+
+from app.core.db import engine
+from app.service.internal.finance_summary_service import finance_views_are_current, refresh_finance_views
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh the finance summary materialized views")
+    parser.add_argument("--blocking", action="store_true",
+                        help="Refresh without CONCURRENTLY (faster, but blocks reads until done)")
+    parser.add_argument("--if-changed", action="store_true",
+                        help="Skip the refresh when no finance, enrollment or location data changed since the last one")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        if args.if_changed and finance_views_are_current(connection):
+            logger.info("Finance summary views are current, nothing to refresh")
+            return
+        logger.info("Refreshing finance summary views")
+        refresh_finance_views(connection, concurrently=not args.blocking)
+    logger.info("Finance summary views refreshed")
+
+
+if __name__ == "__main__":
+    main()
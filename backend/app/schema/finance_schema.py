@@ -87,6 +87,76 @@ class FinancialReportGet(BaseModel):
     class Config:
         from_attributes = True
 
+# Financial reports for one district over a range of years
+class FinancialReportRangeGet(BaseModel):
+    district_id: int
+    start_year: int
+    end_year: int
+    reports: Dict[int, FinancialReportGet] = {}
+
+    class Config:
+        from_attributes = True
+
+
+# Aggregated financial report schemas, totals computed in the database
+class FinanceCategoryTotalGet(BaseModel):
+    id: int
+    name: str
+    super_category_id: int
+    total: float
+
+    class Config:
+        from_attributes = True
+
+class FinanceSuperCategoryTotalGet(BaseModel):
+    id: int
+    name: str
+    total: float
+
+    class Config:
+        from_attributes = True
+
+class FinanceFundTotalGet(BaseModel):
+    id: int
+    state_id: str
+    state_name: str
+    total: float
+
+    class Config:
+        from_attributes = True
+
+class FinanceKindSummaryGet(BaseModel):
+    by_category: List[FinanceCategoryTotalGet] = []
+    by_super_category: List[FinanceSuperCategoryTotalGet] = []
+    by_fund: List[FinanceFundTotalGet] = []
+    total: float = 0.0
+
+    class Config:
+        from_attributes = True
+
+class FinancialSummaryGet(BaseModel):
+    district_id: int
+    year: int
+    balance_sheets: FinanceKindSummaryGet = FinanceKindSummaryGet()
+    revenues: FinanceKindSummaryGet = FinanceKindSummaryGet()
+    expenditures: FinanceKindSummaryGet = FinanceKindSummaryGet()
+
+    class Config:
+        from_attributes = True
+
+
+class FinancePerPupilGet(BaseModel):
+    district_id: int
+    year: int
+    total_revenue: float
+    total_expenditure: float
+    enrollment: Optional[int] = None
+    revenue_per_pupil: Optional[float] = None
+    expenditure_per_pupil: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
 
 class BalanceEntrySuperCategoryGet(BaseModel):
     id: int
@@ -0,0 +1,107 @@
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import Connection
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_path(cache_dir: str, revision: str, name: str) -> str:
+    """Cache file of one of a migration's datasets, e.g. {cache_dir}/2aada939afdc_school.parquet."""
+    return os.path.join(cache_dir, f'{revision}_{name}.parquet')
+
+
+def read_datasets(cache_dir: str, revision: str, names: List[str]) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Read a migration's cached datasets, in the order of names. Returns None unless
+    every one of them is cached, so a partial cache is parsed again from source.
+    """
+    paths = {name: dataset_path(cache_dir, revision, name) for name in names}
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+    return {name: pd.read_parquet(path) for name, path in paths.items()}
+
+
+def write_datasets(
+    cache_dir: str,
+    revision: str,
+    datasets: Dict[str, pd.DataFrame],
+    progress_logger: logging.Logger = logger
+) -> None:
+    """
+    Cache a migration's parsed datasets as Parquet, one file per dataset. Each file
+    is written under a temporary name and then renamed, so an interrupted run never
+    leaves a truncated cache behind.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, df in datasets.items():
+        path = dataset_path(cache_dir, revision, name)
+        df.to_parquet(f'{path}.tmp', index=False)
+        os.replace(f'{path}.tmp', path)
+        progress_logger.info(f"Cached {len(df)} {name} rows at {path} ({os.path.getsize(path)} bytes)")
+
+
+def write_rejects(
+    reject_dir: str,
+    revision: str,
+    name: str,
+    rejects: pd.DataFrame,
+    progress_logger: logging.Logger = logger
+) -> Optional[str]:
+    """
+    Write the rows a migration rejected to {reject_dir}/{revision}_{name}_rejects.csv,
+    replacing the file of an earlier run. Returns its path, or None (and removes any
+    earlier file) when nothing was rejected.
+    """
+    path = os.path.join(reject_dir, f'{revision}_{name}_rejects.csv')
+    if rejects.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    os.makedirs(reject_dir, exist_ok=True)
+    rejects.to_csv(path, index=False)
+    progress_logger.warning(f"Rejected {len(rejects)} {name} rows, written to {path}")
+    return path
+
+
+def dataframe_rows(df: pd.DataFrame):
+    """The frame's rows as tuples of plain Python values, missing values as None."""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def copy_dataframe(cursor, table: str, df: pd.DataFrame) -> int:
+    """COPY a frame into the table, its columns matched by name. Returns the row count."""
+    rows = 0
+    with cursor.copy(f"COPY {table} ({', '.join(df.columns)}) FROM STDIN") as copy:
+        for row in dataframe_rows(df):
+            copy.write_row(row)
+            rows += 1
+    return rows
+
+
+def copy_datasets(
+    connection: Connection,
+    datasets: Dict[str, pd.DataFrame],
+    progress_logger: logging.Logger = logger
+) -> int:
+    """
+    Bulk load datasets named after their tables with COPY FROM STDIN, in the order
+    given (parents before the tables referencing them).
+
+    Runs on the given connection's raw psycopg connection, so everything happens in
+    the caller's transaction and is rolled back with it. Returns the number of rows
+    loaded. Throughput is logged to progress_logger.
+    """
+    total_rows = 0
+    with connection.connection.dbapi_connection.cursor() as cursor:
+        for table, df in datasets.items():
+            start = time.perf_counter()
+            rows = copy_dataframe(cursor, table, df)
+            elapsed = time.perf_counter() - start
+            progress_logger.info(f"Copied {rows} {table} rows in {elapsed:.2f} s "
+                                 f"({rows / elapsed if elapsed else 0:.0f} rows/s)")
+            total_rows += rows
+    return total_rows
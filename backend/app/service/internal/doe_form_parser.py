@@ -0,0 +1,310 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
+
+logger = logging.getLogger(__name__)
+
+# Sheet columns that identify an entry row: column label, page, line and account number
+KEY_COLUMNS = (0, 1, 2, 4)
+
+# Log parse progress every this many workbooks
+PROGRESS_EVERY = 50
+
+
+class DOEFormError(Exception):
+    """A workbook that can't be used, e.g. its district ID doesn't match."""
+
+
+@dataclass
+class BalanceSheetEntry:
+    entry_type_id: int
+    fund_type_id: int
+    value: float
+
+@dataclass
+class RevenueEntry:
+    entry_type_id: int
+    fund_type_id: int
+    value: float
+
+@dataclass
+class ExpenditureEntry:
+    entry_type_id: int
+    fund_type_id: int
+    value: float
+
+@dataclass
+class DOEFormData:
+    district_id: int
+    year: int
+    balance_entries: List[BalanceSheetEntry]
+    revenue_entries: List[RevenueEntry]
+    expenditure_entries: List[ExpenditureEntry]
+
+@dataclass
+class DOEFormJob:
+    full_path: str
+    year: int
+    district_id: int
+    district_name: str
+
+@dataclass
+class DOEFormResult:
+    job: DOEFormJob
+    status: str  # 'parsed', 'missing' (no workbook for this district and year) or 'failed'
+    data: Optional[DOEFormData] = None
+    error: Optional[str] = None
+
+
+def doe_form_file_name(district_name: str, year: int) -> str:
+    """File name of a district's DOE-25 workbook, found under assets/finance/{year}/."""
+    district_name_cleaned = (district_name.lower()
+                             .replace(' school district', '')
+                             .replace(' (carroll county)', '')
+                             .replace('oyster river cooperative', 'oyster river coop')
+                             .replace("'", '')
+                             .strip()
+                             .replace(' ', '-'))
+    return f"{district_name_cleaned}-doe-25-{year}.xlsx"
+
+
+def file_digest(path: str) -> Tuple[int, str]:
+    """Size and sha256 of a workbook, as recorded in finance_ingest_manifest."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return os.path.getsize(path), sha256.hexdigest()
+
+
+class DOEFormSheet:
+    """
+    A DOE-25 sheet indexed by (column label, page, line, account_no).
+
+    The key columns are normalized once, the same way the entries are matched
+    (string, stripped), so each entry lookup is a dict hit instead of a scan of
+    the whole sheet. When a key appears more than once the first row wins.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        keys = zip(*(df.iloc[:, column].astype(str).str.strip() for column in KEY_COLUMNS))
+        self._rows: Dict[Tuple[str, str, str, str], int] = {}
+        for position, key in enumerate(keys):
+            self._rows.setdefault(key, position)
+
+    def find_row(self, excel_column: str, page, line, account_no) -> Optional[int]:
+        """Return the position of the entry's row, or None when the sheet doesn't have it."""
+        account_str = str(account_no) if account_no else 'nan'
+        return self._rows.get((excel_column.strip(), str(page), str(line), account_str))
+
+    def value(self, position: int, column_letter: str):
+        return self.df.iat[position, ord(column_letter) - ord('A')]
+
+
+def read_doe_sheet(full_path: str, sheet_name: str) -> Optional[pd.DataFrame]:
+    """Read the DOE-25 sheet of a workbook, trying each Excel engine in turn."""
+    for engine in ['openpyxl', 'xlrd']:
+        try:
+            return pd.read_excel(full_path, sheet_name=sheet_name, engine=engine)
+        except Exception:
+            continue
+    return None
+
+
+def process_entry_row(sheet: DOEFormSheet,
+                      entry_data: tuple,
+                      fund_types: List[Tuple],
+                      entry_type: str,
+                      year: int) -> List[Tuple[int, int, float]]:
+    """Process a single row from the DOE form."""
+    entries = []
+
+    # Check year restrictions
+    if len(entry_data) > 7 and year not in entry_data[7]:
+        return entries
+
+    entry_id, entry_name, page, line, account_no, category_id, excel_column = entry_data[:7]
+
+    position = sheet.find_row(excel_column, page, line, account_no)
+    if position is None:
+        logger.warning(f"Could not find {entry_type} entry '{excel_column}' (page {page}, line {line})")
+        return entries
+
+    # Process each fund type
+    for fund_id, fund_state_id, state_name, column_letter in fund_types:
+        value = sheet.value(position, column_letter)
+
+        if pd.notna(value):
+            try:
+                float_value = float(str(value).replace(',', ''))
+                if float_value != 0:
+                    # Round to 2 decimal places if this is an expenditure entry
+                    if entry_type == 'expenditure':
+                        float_value = round(float_value, 2)
+                    entries.append((entry_id, fund_id, float_value))
+            except (ValueError, TypeError):
+                continue
+
+    return entries
+
+
+def process_entries(sheet: DOEFormSheet, entry_types: list, fund_types: list, entry_type: str, entry_class, year: int) -> List:
+    """Process all entries of a specific type and return list of entry objects."""
+    entries = []
+    for entry_type_data in entry_types:
+        raw_entries = process_entry_row(sheet, entry_type_data, fund_types, entry_type, year)
+        entries.extend([entry_class(entry_type_id=e[0], fund_type_id=e[1], value=e[2])
+                        for e in raw_entries])
+    return entries
+
+
+def parse_doe_sheet(df: pd.DataFrame, file_path: str, year: int, config: dict, config_district_id: int) -> DOEFormData:
+    """
+    Parse an already read DOE-25 sheet and return structured data.
+
+    Raises DOEFormError when the sheet's district ID is invalid or doesn't match.
+    """
+    # Add robust district ID validation
+    try:
+        raw_district_id = df.iloc[0, 1]
+        if pd.isna(raw_district_id):
+            logger.warning(f"District ID is missing (NaN) in Excel file: {file_path}")
+            logger.warning(f"Using config district ID: {config_district_id}")
+            district_id = config_district_id
+        else:
+            district_id = int(raw_district_id)
+    except (ValueError, TypeError):
+        raise DOEFormError(f"Invalid district ID format, expected a number, got: {df.iloc[0, 1]}")
+
+    if district_id != config_district_id:
+        raise DOEFormError(f"District ID mismatch: config ID {config_district_id}, Excel ID {district_id}")
+
+    sheet = DOEFormSheet(df)
+
+    # Process all entry types
+    balance_entries = process_entries(
+        sheet,
+        config['initial_data']['balance_entry_type'],
+        config['initial_data']['balance_fund_type'],
+        'balance sheet',
+        BalanceSheetEntry,
+        year
+    )
+
+    revenue_entries = process_entries(
+        sheet,
+        config['revenue_data']['revenue_entry_type'],
+        config['revenue_data']['revenue_fund_type'],
+        'revenue',
+        RevenueEntry,
+        year
+    )
+
+    expenditure_entries = process_entries(
+        sheet,
+        config['expenditure_data']['expenditure_entry_type'],
+        config['expenditure_data']['expenditure_fund_type'],
+        'expenditure',
+        ExpenditureEntry,
+        year
+    )
+
+    return DOEFormData(
+        district_id=district_id,
+        year=year,
+        balance_entries=balance_entries,
+        revenue_entries=revenue_entries,
+        expenditure_entries=expenditure_entries
+    )
+
+
+def parse_doe_form(job: DOEFormJob, config: dict) -> DOEFormResult:
+    """Parse a DOE-25 form, reporting missing and unusable workbooks in the result."""
+    try:
+        if not os.path.exists(job.full_path):
+            return DOEFormResult(job=job, status='missing')
+
+        if os.path.getsize(job.full_path) == 0:
+            return DOEFormResult(job=job, status='failed', error="File is empty")
+
+        df = read_doe_sheet(job.full_path, config['file_settings']['sheet_name'])
+        if df is None:
+            return DOEFormResult(job=job, status='failed', error="Failed to read Excel file")
+
+        data = parse_doe_sheet(df, job.full_path, job.year, config, job.district_id)
+        return DOEFormResult(job=job, status='parsed', data=data)
+
+    except DOEFormError as e:
+        return DOEFormResult(job=job, status='failed', error=str(e))
+    except Exception as e:
+        return DOEFormResult(job=job, status='failed', error=f"{e}\n{traceback.format_exc()}")
+
+
+# Set in each pool worker so the config is pickled once per process, not once per workbook
+_worker_config: Optional[dict] = None
+
+def _init_worker(config: dict) -> None:
+    global _worker_config
+    _worker_config = config
+
+def _parse_in_worker(job: DOEFormJob) -> DOEFormResult:
+    return parse_doe_form(job, _worker_config)
+
+
+def parse_doe_forms(
+    jobs: List[DOEFormJob],
+    config: dict,
+    workers: int = 0,
+    progress_logger: logging.Logger = logger
+) -> List[DOEFormResult]:
+    """
+    Parse many DOE-25 forms across a pool of worker processes.
+
+    Results come back in the order of jobs, whatever order the workers finish in,
+    so the output doesn't depend on the worker count. workers <= 0 means one per
+    CPU; 1 parses in this process. Progress is logged to progress_logger.
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, max(len(jobs), 1))
+    results: List[Optional[DOEFormResult]] = [None] * len(jobs)
+    start = time.perf_counter()
+
+    def report_progress(done: int) -> None:
+        if done % PROGRESS_EVERY == 0 or done == len(jobs):
+            elapsed = time.perf_counter() - start
+            progress_logger.info(f"Parsed {done}/{len(jobs)} DOE-25 workbooks in {elapsed:.0f} s "
+                        f"({done / elapsed if elapsed else 0:.1f}/s, {workers} workers)")
+
+    if workers == 1:
+        for index, job in enumerate(jobs):
+            results[index] = parse_doe_form(job, config)
+            report_progress(index + 1)
+        return results
+
+    # spawn rather than fork: the parent holds an open database connection
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(config,)) as executor:
+        futures = {executor.submit(_parse_in_worker, job): index for index, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. out of memory), not just the parse
+                results[index] = DOEFormResult(job=jobs[index], status='failed', error=f"Worker failed: {e}")
+            report_progress(done)
+
+    return results
@@ -0,0 +1,117 @@
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EnrollmentWorkbook:
+    year: int
+    full_path: str
+    schools: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+# Positions of the school columns, by the key they get in the parsed school data
+SCHOOL_COLUMNS = {
+    'school_id': 4,
+    'school_name': 5,
+    'sau_id': 0,
+    'sau_name': 1,
+    'district_id': 2,
+    'district_name': 3,
+    'total': 21,
+}
+
+
+def clean_enrollments(values: pd.Series) -> pd.Series:
+    """
+    Clean a column of grade enrollment cells. Returns the positive ones as integers,
+    with the index of their cells; missing, zero and negative values are dropped.
+    """
+    values = values[values.notna()]
+    return values[values > 0].astype('int64')
+
+
+def parse_excel_file(df, year, config):
+    """
+    Parse a single Excel file and return enrollment data structure.
+
+    School rows are the ones with an SAU number in the first column. Their grade
+    columns are melted into one (row, grade) cell each and cleaned as a column,
+    then gathered back into each school's enrollments, in the order of
+    grade_positions. Schools without any enrollment are left out.
+    """
+    grade_positions = config['excel_settings']['grade_positions']
+
+    # Skip to the data rows, keep the school rows
+    df = df.iloc[config['excel_settings']['data_start_row']:]
+    df = df[pd.to_numeric(df.iloc[:, 0], errors='coerce').notna()].reset_index(drop=True)
+
+    grades = df.iloc[:, list(grade_positions.values())].set_axis(list(grade_positions), axis=1)
+    cells = grades.rename_axis('position').reset_index().melt(id_vars='position', var_name='grade')
+    enrollment = clean_enrollments(cells['value'])
+    cells = cells.loc[enrollment.index].assign(value=enrollment)
+
+    # melt stacks the grades one after another, put each row's grades back together
+    cells['grade_order'] = cells['grade'].map({grade: order for order, grade in enumerate(grade_positions)})
+    cells = cells.sort_values(['position', 'grade_order'], kind='stable')
+
+    enrollments = {}
+    for position, grade, value in cells[['position', 'grade', 'value']].itertuples(index=False, name=None):
+        enrollments.setdefault(position, {})[grade] = value
+
+    schools = df.iloc[:, list(SCHOOL_COLUMNS.values())].set_axis(list(SCHOOL_COLUMNS), axis=1)
+    return [
+        {**school, 'year': year, 'enrollments': enrollments[position]}
+        for position, school in enumerate(schools.to_dict('records'))
+        if position in enrollments
+    ]
+
+
+def parse_enrollment_workbook(workbook: EnrollmentWorkbook, config: dict) -> EnrollmentWorkbook:
+    """Read and parse a yearly enrollment workbook, reporting a workbook that can't be read in its error."""
+    try:
+        df = pd.read_excel(workbook.full_path)
+        workbook.schools = parse_excel_file(df, workbook.year, config)
+    except Exception as e:
+        workbook.error = f"{e}\n{traceback.format_exc()}"
+    return workbook
+
+
+def parse_enrollment_workbooks(
+    workbooks: List[EnrollmentWorkbook],
+    config: dict,
+    workers: int = 0,
+    progress_logger: logging.Logger = logger
+) -> List[EnrollmentWorkbook]:
+    """
+    Parse the yearly enrollment workbooks across a pool of worker processes.
+
+    Results come back in the order of workbooks. workers <= 0 means one per CPU;
+    1 parses in this process.
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, max(len(workbooks), 1))
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = [parse_enrollment_workbook(workbook, config) for workbook in workbooks]
+    else:
+        # spawn rather than fork: the parent holds an open database connection
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            results = list(executor.map(partial(parse_enrollment_workbook, config=config), workbooks))
+
+    elapsed = time.perf_counter() - start
+    progress_logger.info(f"Parsed {len(workbooks)} enrollment workbooks in {elapsed:.1f} s ({workers} workers)")
+    return results
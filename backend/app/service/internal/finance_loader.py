@@ -0,0 +1,176 @@
+import logging
+import time
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from sqlalchemy import Connection
+
+from app.service.internal.doe_form_parser import BalanceSheetEntry, DOEFormData, ExpenditureEntry, RevenueEntry
+
+logger = logging.getLogger(__name__)
+
+# Fact table COPY targets: (DOEFormData attribute, table, entry type FK column, fund type FK column)
+FACT_TABLES = [
+    ('balance_entries', 'balance_sheet', 'balance_entry_type_id_fk', 'balance_fund_type_id_fk'),
+    ('revenue_entries', 'revenue', 'revenue_entry_type_id_fk', 'revenue_fund_type_id_fk'),
+    ('expenditure_entries', 'expenditure', 'expenditure_entry_type_id_fk', 'expenditure_fund_type_id_fk'),
+]
+
+# Entry class of each DOEFormData fact attribute
+FACT_ENTRY_CLASSES = {
+    'balance_entries': BalanceSheetEntry,
+    'revenue_entries': RevenueEntry,
+    'expenditure_entries': ExpenditureEntry,
+}
+
+# Datasets of parsed forms as cached by the finance migration: the forms, then one per fact table
+DOE_FORM_DATASETS = ['doe_form'] + [table for _, table, _, _ in FACT_TABLES]
+
+FACT_COLUMNS = ['district_id', 'year', 'entry_type_id', 'fund_type_id', 'value']
+FACT_DTYPES = {'district_id': 'int64', 'year': 'int64', 'entry_type_id': 'int64', 'fund_type_id': 'int64',
+               'value': 'float64'}
+
+
+def forms_to_datasets(forms: List[DOEFormData]) -> Dict[str, pd.DataFrame]:
+    """Flatten parsed forms into DOE_FORM_DATASETS, facts keyed by their form's district and year."""
+    datasets = {
+        'doe_form': pd.DataFrame(
+            [(form.district_id, form.year) for form in forms], columns=['district_id', 'year']
+        ).astype('int64')
+    }
+    for attribute, table, _, _ in FACT_TABLES:
+        rows = [(form.district_id, form.year, entry.entry_type_id, entry.fund_type_id, entry.value)
+                for form in forms for entry in getattr(form, attribute)]
+        datasets[table] = pd.DataFrame(rows, columns=FACT_COLUMNS).astype(FACT_DTYPES)
+    return datasets
+
+
+def datasets_to_forms(datasets: Dict[str, pd.DataFrame]) -> List[DOEFormData]:
+    """Rebuild the forms from DOE_FORM_DATASETS, in the order they were parsed."""
+    forms = {
+        (district_id, year): DOEFormData(district_id=district_id, year=year, balance_entries=[],
+                                         revenue_entries=[], expenditure_entries=[])
+        for district_id, year in datasets['doe_form'].itertuples(index=False, name=None)
+    }
+    for attribute, table, _, _ in FACT_TABLES:
+        entry_class = FACT_ENTRY_CLASSES[attribute]
+        for district_id, year, entry_type_id, fund_type_id, value in (
+            datasets[table][FACT_COLUMNS].astype(object).itertuples(index=False, name=None)
+        ):
+            getattr(forms[(district_id, year)], attribute).append(
+                entry_class(entry_type_id=entry_type_id, fund_type_id=fund_type_id, value=value)
+            )
+    return list(forms.values())
+
+
+def insert_doe_forms(cursor, forms: List[DOEFormData]) -> Dict[Tuple[int, int], int]:
+    """Insert the forms' doe_form rows in one statement and return their ids by (district_id, year)."""
+    cursor.execute(
+        """
+        INSERT INTO doe_form (district_id_fk, year)
+        SELECT * FROM unnest(%s::INTEGER[], %s::INTEGER[])
+        RETURNING id, district_id_fk, year
+        """,
+        ([form.district_id for form in forms], [form.year for form in forms])
+    )
+    return {(district_id, year): doe_form_id for doe_form_id, district_id, year in cursor.fetchall()}
+
+
+def upsert_doe_forms(cursor, forms: List[DOEFormData]) -> Dict[Tuple[int, int], int]:
+    """
+    Insert the forms' doe_form rows, keeping the id of any that already exist, and
+    delete the existing forms' facts so they can be loaded again.
+    Returns the ids by (district_id, year).
+    """
+    cursor.execute(
+        """
+        INSERT INTO doe_form (district_id_fk, year)
+        SELECT * FROM unnest(%s::INTEGER[], %s::INTEGER[])
+        ON CONFLICT (district_id_fk, year) DO UPDATE SET date_updated = CURRENT_TIMESTAMP
+        RETURNING id, district_id_fk, year
+        """,
+        ([form.district_id for form in forms], [form.year for form in forms])
+    )
+    doe_form_ids = {(district_id, year): doe_form_id for doe_form_id, district_id, year in cursor.fetchall()}
+
+    for _, table, _, _ in FACT_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE doe_form_id_fk = ANY(%s)", (list(doe_form_ids.values()),))
+    return doe_form_ids
+
+
+def delete_doe_forms(connection: Connection, district_years: List[Tuple[int, int]]) -> int:
+    """
+    Delete the doe_form rows of the given (district_id, year) pairs with their facts,
+    in the caller's transaction. Returns the number of forms deleted.
+    """
+    if not district_years:
+        return 0
+
+    with connection.connection.dbapi_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id FROM doe_form
+            WHERE (district_id_fk, year) IN (SELECT * FROM unnest(%s::INTEGER[], %s::INTEGER[]))
+            """,
+            ([district_id for district_id, _ in district_years], [year for _, year in district_years])
+        )
+        doe_form_ids = [doe_form_id for doe_form_id, in cursor.fetchall()]
+        for _, table, _, _ in FACT_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE doe_form_id_fk = ANY(%s)", (doe_form_ids,))
+        cursor.execute("DELETE FROM doe_form WHERE id = ANY(%s)", (doe_form_ids,))
+    return len(doe_form_ids)
+
+
+def copy_facts(
+    cursor,
+    forms: List[DOEFormData],
+    doe_form_ids: Dict[Tuple[int, int], int],
+    progress_logger: logging.Logger = logger
+) -> int:
+    """Stream the forms' balance sheet, revenue and expenditure rows with COPY. Returns the row count."""
+    total_rows = 0
+    for attribute, table, entry_type_column, fund_type_column in FACT_TABLES:
+        start = time.perf_counter()
+        rows = 0
+        with cursor.copy(
+            f"COPY {table} (doe_form_id_fk, {entry_type_column}, {fund_type_column}, value) FROM STDIN"
+        ) as copy:
+            for form in forms:
+                doe_form_id = doe_form_ids[(form.district_id, form.year)]
+                for entry in getattr(form, attribute):
+                    copy.write_row((doe_form_id, entry.entry_type_id, entry.fund_type_id, entry.value))
+                    rows += 1
+        elapsed = time.perf_counter() - start
+        progress_logger.info(f"Copied {rows} {table} rows in {elapsed:.2f} s "
+                             f"({rows / elapsed if elapsed else 0:.0f} rows/s)")
+        total_rows += rows
+    return total_rows
+
+
+def load_doe_forms(
+    connection: Connection,
+    forms: List[DOEFormData],
+    progress_logger: logging.Logger = logger,
+    replace: bool = False
+) -> int:
+    """
+    Bulk load parsed DOE-25 forms: doe_form rows with one INSERT ... RETURNING, then
+    the fact rows with COPY FROM STDIN. With replace, forms already in the database
+    (same district and year) keep their id and have their facts replaced.
+
+    Runs on the given connection's raw psycopg connection, so everything happens in
+    the caller's transaction and is rolled back with it. Returns the number of fact
+    rows loaded. Throughput is logged to progress_logger.
+    """
+    if not forms:
+        return 0
+
+    start = time.perf_counter()
+    with connection.connection.dbapi_connection.cursor() as cursor:
+        doe_form_ids = upsert_doe_forms(cursor, forms) if replace else insert_doe_forms(cursor, forms)
+        total_rows = copy_facts(cursor, forms, doe_form_ids, progress_logger)
+
+    elapsed = time.perf_counter() - start
+    progress_logger.info(f"Loaded {len(forms)} DOE forms and {total_rows} fact rows in {elapsed:.2f} s "
+                         f"({total_rows / elapsed if elapsed else 0:.0f} rows/s)")
+    return total_rows
@@ -0,0 +1,58 @@
+import json
+import logging
+import time
+from typing import Dict
+
+from sqlalchemy import Connection, text
+
+logger = logging.getLogger(__name__)
+
+# Materialized views derived from the finance tables, in refresh order
+FINANCE_VIEWS = ["finance_summary", "finance_per_pupil"]
+
+# Data versions of the tables the views are built from: the finance tables, and
+# school_enrollment and school for finance_per_pupil
+FINANCE_VIEW_DATA_VERSIONS = ["finance", "enrollment", "location"]
+
+
+def source_data_versions(connection: Connection) -> Dict[str, int]:
+    """The current data versions of the tables the finance views are built from."""
+    rows = connection.execute(
+        text("SELECT name, version FROM data_version WHERE name = ANY(:names)"),
+        {"names": FINANCE_VIEW_DATA_VERSIONS}
+    )
+    return {name: version for name, version in rows}
+
+
+def finance_views_are_current(connection: Connection) -> bool:
+    """Whether every finance view was last refreshed at the current data versions of its source tables."""
+    refreshed = dict(connection.execute(text("SELECT view_name, data_versions FROM finance_view_refresh")).all())
+    versions = source_data_versions(connection)
+    return all(refreshed.get(view) == versions for view in FINANCE_VIEWS)
+
+
+def refresh_finance_views(connection: Connection, concurrently: bool = True) -> None:
+    """
+    Refresh the materialized views derived from the finance tables. Must be run
+    after any finance load, the views are not kept up to date by the database.
+
+    CONCURRENTLY keeps the views readable while they refresh but only works on
+    views that are already populated.
+
+    The data versions the views were refreshed at are recorded in
+    finance_view_refresh, see finance_views_are_current. They are read before the
+    refresh, so a load that commits during it leaves the views marked as stale.
+    """
+    versions = json.dumps(source_data_versions(connection))
+    mode = "CONCURRENTLY " if concurrently else ""
+    for view in FINANCE_VIEWS:
+        start = time.perf_counter()
+        connection.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{view}"))
+        connection.execute(text("""
+            INSERT INTO finance_view_refresh (view_name, data_versions)
+            VALUES (:view_name, CAST(:data_versions AS JSONB))
+            ON CONFLICT (view_name) DO UPDATE SET
+                data_versions = EXCLUDED.data_versions,
+                date_updated = CURRENT_TIMESTAMP
+        """), {"view_name": view, "data_versions": versions})
+        logger.info(f"Refreshed {view} in {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,53 @@
+import logging
+from dataclasses import dataclass
+from typing import AbstractSet, FrozenSet, Tuple
+
+import pandas as pd
+from sqlalchemy import Connection, text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class KnownIds:
+    schools: FrozenSet[int]
+    districts: FrozenSet[int]
+
+
+def load_known_ids(connection: Connection) -> KnownIds:
+    """The school and district IDs in the database, read once so rows can be checked in memory."""
+    return KnownIds(
+        schools=frozenset(connection.execute(text("SELECT id FROM school")).scalars()),
+        districts=frozenset(connection.execute(text("SELECT id FROM district")).scalars()),
+    )
+
+
+def split_unknown_ids(
+    df: pd.DataFrame,
+    column: str,
+    known: AbstractSet[int],
+    description: str,
+    progress_logger: logging.Logger = logger
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split the rows into those whose column is null or one of the known IDs and
+    those that aren't. How many rows were rejected, and for which IDs, is logged
+    to progress_logger.
+    """
+    unknown = df[column].notna() & ~df[column].isin(known)
+    if unknown.any():
+        unknown_ids = sorted(int(value) for value in df.loc[unknown, column].unique())
+        progress_logger.warning(f"Dropped {int(unknown.sum())} {description} rows for {len(unknown_ids)} "
+                                f"unknown {column} values: {unknown_ids}")
+    return df[~unknown].reset_index(drop=True), df[unknown].reset_index(drop=True)
+
+
+def drop_unknown_ids(
+    df: pd.DataFrame,
+    column: str,
+    known: AbstractSet[int],
+    description: str,
+    progress_logger: logging.Logger = logger
+) -> pd.DataFrame:
+    """Keep the rows whose column is null or one of the known IDs, see split_unknown_ids."""
+    return split_unknown_ids(df, column, known, description, progress_logger)[0]
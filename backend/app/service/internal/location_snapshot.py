@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy.orm import raiseload
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.data_version import get_data_version
+from app.model.enrollment import SchoolEnrollment
+from app.model.location import (
+    SAU, SAUStaff, District, Region, SchoolType, Grade, Town, School,
+    SchoolGradeLink, TownDistrictLink
+)
+
+logger = logging.getLogger(__name__)
+
+# Data versions the snapshot is built from; a change to any of them triggers a rebuild
+SNAPSHOT_DATA_VERSIONS = ('location', 'enrollment')
+
+# Versions of a snapshot built while the data versions couldn't be read, never equal to real ones
+UNREAD_VERSIONS: Tuple[int, ...] = ()
+
+
+# Records are named after the fields of the matching response schemas
+# (app.schema.location_schema), so the schemas validate them directly.
+class NamedRecord:
+    """A region, school type or grade."""
+    __slots__ = ('id', 'name')
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+
+
+class SAUStaffRecord:
+    __slots__ = ('id', 'first_name', 'last_name', 'title', 'admin_type', 'email')
+
+    def __init__(self, staff: SAUStaff):
+        for name in self.__slots__:
+            setattr(self, name, getattr(staff, name))
+
+
+class SAURecord:
+    __slots__ = ('id', 'name', 'address1', 'address2', 'town', 'state', 'zip', 'phone', 'fax', 'webpage',
+                 'town_id_fk', 'staff')
+
+    def __init__(self, sau: Union[SAU, "SAURecord"], staff: Tuple[SAUStaffRecord, ...]):
+        for name in self.__slots__[:-1]:
+            setattr(self, name, getattr(sau, name))
+        self.staff = staff
+
+    def without_staff(self) -> "SAURecord":
+        """The same SAU with no staff, for responses that leave the staff out."""
+        return SAURecord(self, ())
+
+
+class DistrictRecord:
+    __slots__ = ('id', 'name', 'sau_id_fk', 'is_public', 'towns')
+
+    def __init__(self, district: District, town_ids: Tuple[int, ...]):
+        self.id = district.id
+        self.name = district.name
+        self.sau_id_fk = district.sau_id_fk
+        self.is_public = district.is_public
+        self.towns = town_ids
+
+
+class TownRecord:
+    __slots__ = ('id', 'name', 'district_ids')
+
+    def __init__(self, town: Town, district_ids: Tuple[int, ...]):
+        self.id = town.id
+        self.name = town.name
+        self.district_ids = district_ids
+
+
+class SchoolRecord:
+    __slots__ = ('id', 'name', 'sau_id_fk', 'district_id_fk', 'region_id_fk', 'school_type_id_fk', 'town_id_fk',
+                 'principal_first_name', 'principal_last_name', 'address1', 'address2', 'city', 'state', 'zip',
+                 'phone', 'fax', 'email', 'county', 'webpage',
+                 'school_type', 'grades', 'enrollment', 'latest_enrollment')
+
+    def __init__(
+        self,
+        school: School,
+        school_type: Optional[NamedRecord],
+        grades: Tuple[NamedRecord, ...],
+        latest_enrollments: List[Tuple[NamedRecord, int]]
+    ):
+        for name in self.__slots__[:-4]:
+            setattr(self, name, getattr(school, name))
+        self.school_type = school_type
+        self.grades = grades
+
+        # Enrollment of the school's latest year by grade ID and by grade name, plus a
+        # total, unless the school has no enrollment data at all
+        self.enrollment = {grade.id: enrollment for grade, enrollment in latest_enrollments}
+        self.latest_enrollment = {grade.name: enrollment for grade, enrollment in latest_enrollments}
+        if latest_enrollments:
+            self.latest_enrollment['total'] = sum(enrollment for _, enrollment in latest_enrollments)
+
+
+@dataclass(frozen=True)
+class LocationSnapshot:
+    """
+    Every location record by ID, in ID order, with the links between them resolved.
+    Shared by all requests, so nothing in it may be modified.
+    """
+    versions: Tuple[int, ...]
+    saus: Dict[int, SAURecord]
+    districts: Dict[int, DistrictRecord]
+    towns: Dict[int, TownRecord]
+    schools: Dict[int, SchoolRecord]
+    regions: Dict[int, NamedRecord]
+    school_types: Dict[int, NamedRecord]
+    grades: Dict[int, NamedRecord]
+    schools_by_district: Dict[int, Tuple[SchoolRecord, ...]]
+
+
+# Loader options of the build queries. Rows become records right away and links are
+# read from their link tables, so no relationship is ever loaded; one that is raises
+# instead of lazy loading row by row, which keeps the build at a fixed query count.
+_LOADER_OPTIONS = (raiseload('*'),)
+
+
+@dataclass(frozen=True)
+class DistrictTownLinks:
+    """The town_district_xref link table as adjacency maps, in link order."""
+    towns_by_district: Dict[int, List[int]]
+    districts_by_town: Dict[int, List[int]]
+
+
+def _unique(values) -> tuple:
+    """The values without repeats, in first-seen order, as a relationship collection holds a link loaded twice."""
+    return tuple(dict.fromkeys(values))
+
+
+async def _all_rows(session: AsyncSession, model) -> list:
+    """Get all rows of a table in ID order."""
+    return (await session.exec(select(model).options(*_LOADER_OPTIONS).order_by(model.id))).all()
+
+
+async def _get_staff(session: AsyncSession) -> Dict[int, List[SAUStaffRecord]]:
+    """Get all SAU staff in one query, grouped by SAU ID."""
+    statement = select(SAUStaff).options(*_LOADER_OPTIONS).order_by(SAUStaff.sau_id_fk, SAUStaff.id)
+    staff_by_sau: Dict[int, List[SAUStaffRecord]] = {}
+    for staff in (await session.exec(statement)).all():
+        staff_by_sau.setdefault(staff.sau_id_fk, []).append(SAUStaffRecord(staff))
+    return staff_by_sau
+
+
+async def _get_district_town_links(session: AsyncSession) -> DistrictTownLinks:
+    """
+    Read the district/town link table into adjacency maps, district ID to town IDs
+    and town ID to district IDs.
+    """
+    statement = select(TownDistrictLink.district_id_fk, TownDistrictLink.town_id_fk).order_by(TownDistrictLink.id)
+    towns_by_district: Dict[int, List[int]] = {}
+    districts_by_town: Dict[int, List[int]] = {}
+    for district_id, town_id in (await session.exec(statement)).all():
+        towns_by_district.setdefault(district_id, []).append(town_id)
+        districts_by_town.setdefault(town_id, []).append(district_id)
+    return DistrictTownLinks(towns_by_district=towns_by_district, districts_by_town=districts_by_town)
+
+
+async def _get_school_grades(session: AsyncSession) -> Dict[int, List[int]]:
+    """Read the school/grade link table into school ID to grade IDs, in link order."""
+    statement = select(SchoolGradeLink.school_id_fk, SchoolGradeLink.grade_id_fk).order_by(SchoolGradeLink.id)
+    grades_by_school: Dict[int, List[int]] = {}
+    for school_id, grade_id in (await session.exec(statement)).all():
+        grades_by_school.setdefault(school_id, []).append(grade_id)
+    return grades_by_school
+
+
+async def _get_latest_enrollments(session: AsyncSession) -> Dict[int, List[Tuple[int, int]]]:
+    """
+    Get each school's (grade ID, enrollment) pairs for its latest year, in one query
+    for all schools, in insertion order. The latest year is picked per school with a
+    window function.
+    """
+    ranked = select(
+        SchoolEnrollment.id,
+        SchoolEnrollment.school_id_fk,
+        SchoolEnrollment.grade_id_fk,
+        SchoolEnrollment.year,
+        SchoolEnrollment.enrollment,
+        func.max(SchoolEnrollment.year).over(partition_by=SchoolEnrollment.school_id_fk).label("latest_year")
+    ).subquery()
+
+    statement = select(ranked.c.school_id_fk, ranked.c.grade_id_fk, ranked.c.enrollment).where(
+        ranked.c.year == ranked.c.latest_year
+    ).order_by(ranked.c.school_id_fk, ranked.c.id)
+
+    latest_enrollments: Dict[int, List[Tuple[int, int]]] = {}
+    for school_id, grade_id, enrollment in (await session.exec(statement)).all():
+        latest_enrollments.setdefault(school_id, []).append((grade_id, enrollment))
+    return latest_enrollments
+
+
+async def build_location_snapshot(
+    session: AsyncSession,
+    versions: Tuple[int, ...] = UNREAD_VERSIONS
+) -> LocationSnapshot:
+    """
+    Read the location tables, link tables and latest school enrollment into a
+    LocationSnapshot, in a fixed number of queries however many rows there are.
+    """
+    regions = {row.id: NamedRecord(row.id, row.name) for row in await _all_rows(session, Region)}
+    school_types = {row.id: NamedRecord(row.id, row.name) for row in await _all_rows(session, SchoolType)}
+    grades = {row.id: NamedRecord(row.id, row.name) for row in await _all_rows(session, Grade)}
+
+    staff_by_sau = await _get_staff(session)
+    saus = {sau.id: SAURecord(sau, tuple(staff_by_sau.get(sau.id, ()))) for sau in await _all_rows(session, SAU)}
+
+    links = await _get_district_town_links(session)
+    districts = {
+        district.id: DistrictRecord(district, _unique(links.towns_by_district.get(district.id, ())))
+        for district in await _all_rows(session, District)
+    }
+    towns = {
+        town.id: TownRecord(town, _unique(links.districts_by_town.get(town.id, ())))
+        for town in await _all_rows(session, Town)
+    }
+
+    grades_by_school = await _get_school_grades(session)
+    latest_enrollments = await _get_latest_enrollments(session)
+    schools = {
+        school.id: SchoolRecord(
+            school,
+            school_types.get(school.school_type_id_fk),
+            _unique(grades[grade_id] for grade_id in grades_by_school.get(school.id, ()) if grade_id in grades),
+            [(grades[grade_id], enrollment) for grade_id, enrollment in latest_enrollments.get(school.id, [])
+             if grade_id in grades]
+        )
+        for school in await _all_rows(session, School)
+    }
+    schools_by_district: Dict[int, List[SchoolRecord]] = {}
+    for school in schools.values():
+        schools_by_district.setdefault(school.district_id_fk, []).append(school)
+
+    return LocationSnapshot(
+        versions=versions,
+        saus=saus,
+        districts=districts,
+        towns=towns,
+        schools=schools,
+        regions=regions,
+        school_types=school_types,
+        grades=grades,
+        schools_by_district={district_id: tuple(rows) for district_id, rows in schools_by_district.items()},
+    )
+
+
+class LocationSnapshotStore:
+    """
+    Holds the current LocationSnapshot of this worker.
+
+    The snapshot is rebuilt when one of its data versions changes and then swapped
+    in with a single assignment, so a request keeps a consistent view of the snapshot
+    it started with while the next one is built.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[LocationSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    async def _versions(self, session: AsyncSession) -> Optional[Tuple[int, ...]]:
+        versions = tuple([await get_data_version(session, name) for name in SNAPSHOT_DATA_VERSIONS])
+        return None if None in versions else versions
+
+    async def get(self, session: AsyncSession) -> LocationSnapshot:
+        """
+        Get the snapshot for the current data versions. While the versions can't be
+        read (e.g. during migrations) the last snapshot is served; if there is none
+        yet, one is built and kept under UNREAD_VERSIONS until they can be read again.
+        """
+        versions = await self._versions(session)
+        snapshot = self._snapshot
+        if snapshot is not None and (versions is None or snapshot.versions == versions):
+            return snapshot
+
+        async with self._lock:
+            # Another request may have built it while this one waited
+            snapshot = self._snapshot
+            if snapshot is not None and (versions is None or snapshot.versions == versions):
+                return snapshot
+
+            start = time.perf_counter()
+            versions = UNREAD_VERSIONS if versions is None else versions
+            snapshot = await build_location_snapshot(session, versions)
+            self._snapshot = snapshot
+            logger.info(f"Built location snapshot for data versions {versions}: {len(snapshot.saus)} SAUs, "
+                        f"{len(snapshot.districts)} districts, {len(snapshot.schools)} schools, "
+                        f"{len(snapshot.towns)} towns in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return snapshot
+
+    async def load(self, session: AsyncSession) -> None:
+        """Build the snapshot up front, e.g. at startup, so the first request doesn't wait for it."""
+        try:
+            await self.get(session)
+        except Exception as e:
+            logger.warning(f"Location snapshot could not be built, it will be built on first use: {e}")
+
+
+location_snapshot = LocationSnapshotStore()
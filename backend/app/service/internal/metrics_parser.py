@@ -0,0 +1,127 @@
+from typing import Dict
+
+import pandas as pd
+
+
+def process_measurement_categories(df, config):
+    """Process measurement categories from DataFrame."""
+    categories = {}
+    category_column = config['column_mappings']['indicator_category']
+
+    for category in df[category_column].dropna().unique():
+        categories[category] = {
+            'name': category,
+            'measurement_types': {}
+        }
+
+    return categories
+
+def process_measurement_types(df, categories, config):
+    """Process measurement types and associate them with categories."""
+    measurement_types = df[[
+        config['column_mappings']['indicator_category'],
+        config['column_mappings']['indicator_name']
+    ]].dropna(subset=[config['column_mappings']['indicator_name']]).drop_duplicates()
+
+    current_category = None
+    for _, row in measurement_types.iterrows():
+        category = row[config['column_mappings']['indicator_category']]
+        indicator = row[config['column_mappings']['indicator_name']]
+
+        if pd.notna(category):
+            current_category = category
+
+        if current_category is None:
+            continue
+
+        if current_category in categories:
+            categories[current_category]['measurement_types'][indicator] = {
+                'name': indicator
+            }
+
+    return categories
+
+
+def clean_values(values: pd.Series, config: dict) -> pd.Series:
+    """
+    Clean measurement values by removing %,$, etc. and handling special values.
+
+    Takes a column of non-missing cell values and returns the cleaned value strings,
+    None where the value is empty, a null value or matches a skip pattern. Values
+    starting with > or < lose their sign along with everything else but digits and dots.
+    """
+    value_str = values.map(str).astype(object)
+
+    skip = value_str.eq('') | value_str.isin(config['special_values']['null_values'])
+    for pattern in config['special_values']['skip_patterns']:
+        skip |= value_str.str.contains(pattern, regex=False)
+
+    bounded = value_str.str.startswith(('>', '<'))
+    cleaned = value_str.str.replace(r'[^0-9.-]', '', regex=True)
+    cleaned[bounded] = value_str[bounded].str.replace(r'[^0-9.]', '', regex=True)
+
+    return cleaned.where(~skip & cleaned.ne(''), None)
+
+
+def process_measurements(df: pd.DataFrame, config: dict) -> Dict[str, dict]:
+    """
+    Process measurements and organize by entity.
+
+    Indicator and entity type are only filled in on the first row of each block,
+    so they are carried down the sheet with ffill. The year columns are then
+    melted into one (row, year) value per cell and cleaned as a column. Entities
+    and their measurements come out in sheet order, measurements by row and then
+    by the order of measurement_years.
+    """
+    columns = config['column_mappings']
+    years = [year for year in columns['measurement_years'] if year in df.columns]
+
+    indicator = df[columns['indicator_name']].ffill()
+    entity_type = df[columns['entity_type']].ffill()
+    entity_id = df[columns['entity_id']]
+    rows = indicator.notna() & entity_type.notna() & entity_id.notna()
+
+    sheet = pd.DataFrame({
+        'position': range(rows.sum()),
+        'entity_id': entity_id[rows].map(str).astype(object).to_numpy(),
+        'name': (df[columns['entity_name']][rows].to_numpy() if columns['entity_name'] in df.columns
+                 else 'Unknown'),
+        'type': entity_type[rows].to_numpy(),
+        'indicator': indicator[rows].to_numpy(),
+    })
+    for year in years:
+        # As Python objects, so melting year columns of different dtypes doesn't upcast them
+        sheet[year] = df[year][rows].astype(object).to_numpy()
+
+    # Each entity's name and type come from the first row it appears on
+    measurements = {
+        entity['entity_id']: {
+            'id': entity['entity_id'],
+            'name': entity['name'],
+            'type': entity['type'],
+            'measurements': []
+        }
+        for entity in sheet.drop_duplicates('entity_id')[['entity_id', 'name', 'type']].to_dict('records')
+    }
+    if not years:
+        return measurements
+
+    cells = sheet.melt(id_vars=['position', 'entity_id', 'indicator'], value_vars=years, var_name='year')
+    cells = cells[cells['value'].notna()]
+    cells['value'] = clean_values(cells['value'], config)
+    cells = cells[cells['value'].notna()]
+
+    # melt stacks the years one after another, put each row's years back together
+    cells['year_order'] = cells['year'].map({year: order for order, year in enumerate(years)})
+    cells = cells.sort_values(['position', 'year_order'], kind='stable')
+
+    for entity_id, indicator, year, value in cells[['entity_id', 'indicator', 'year', 'value']].itertuples(
+        index=False, name=None
+    ):
+        measurements[entity_id]['measurements'].append({
+            'indicator': indicator,
+            'year': year,
+            'value': value
+        })
+
+    return measurements
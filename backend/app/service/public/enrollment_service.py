@@ -1,14 +1,16 @@
 from typing import List, Optional
-from sqlmodel import Session, select, func
+from sqlalchemy.orm import selectinload
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 
 from app.model.enrollment import SchoolEnrollment
 from app.schema.enrollment_schema import SchoolEnrollmentGet
 
 class EnrollmentService:
-    def get_school_enrollments(
+    async def get_school_enrollments(
         self, 
-        session: Session,
+        session: AsyncSession,
         school_id: int,
         year: Optional[int] = None
     ) -> List[SchoolEnrollmentGet]:
@@ -23,42 +25,46 @@ class EnrollmentService:
         Returns:
             List of school enrollments
         """
-        statement = select(SchoolEnrollment).where(SchoolEnrollment.school_id_fk == school_id)
+        statement = select(SchoolEnrollment).options(
+            selectinload(SchoolEnrollment.grade)
+        ).where(SchoolEnrollment.school_id_fk == school_id)
         
         if year is not None:
             statement = statement.where(SchoolEnrollment.year == year)
             
-        enrollments = session.exec(statement).all()
+        enrollments = (await session.exec(statement)).all()
         return [SchoolEnrollmentGet.from_orm(enrollment) for enrollment in enrollments]
     
-    def get_latest_school_enrollments(
+    async def get_latest_school_enrollments(
         self, 
-        session: Session,
+        session: AsyncSession,
         school_id: int
     ) -> List[SchoolEnrollmentGet]:
         # First check if the school exists
-        school_exists = session.exec(
+        school_exists = (await session.exec(
             select(func.count()).where(SchoolEnrollment.school_id_fk == school_id)
-        ).one()
+        )).one()
         
         if school_exists == 0:
             raise HTTPException(status_code=404, detail="No enrollment data found for this school")
         
         # Get the latest year for which we have enrollment data for this school
-        latest_year = session.exec(
+        latest_year = (await session.exec(
             select(func.max(SchoolEnrollment.year)).where(SchoolEnrollment.school_id_fk == school_id)
-        ).one()
+        )).one()
         
         if latest_year is None:
             return []
         
         # Get enrollments for the latest year
-        statement = select(SchoolEnrollment).where(
+        statement = select(SchoolEnrollment).options(
+            selectinload(SchoolEnrollment.grade)
+        ).where(
             SchoolEnrollment.school_id_fk == school_id,
             SchoolEnrollment.year == latest_year
         )
         
-        enrollments = session.exec(statement).all()
+        enrollments = (await session.exec(statement)).all()
         return [SchoolEnrollmentGet.from_orm(enrollment) for enrollment in enrollments]
 
 enrollment_service = EnrollmentService() 
\ No newline at end of file
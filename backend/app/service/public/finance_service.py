@@ -1,7 +1,12 @@
-from typing import List, Optional, Dict, Any
-from sqlmodel import Session, select
+from typing import AsyncIterator, List, Optional, Dict, Any
+from sqlalchemy import DateTime, Float, Integer, cast, func, literal, null, tuple_, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.utils.cache import cached
 from app.model.finance import (
     DOEForm, BalanceSheet, Revenue, Expenditure,
     BalanceEntryType, BalanceFundType,
@@ -11,199 +16,482 @@ from app.model.finance import (
     RevenueEntryCategory, RevenueEntrySuperCategory,
     ExpenditureEntryCategory, ExpenditureEntrySuperCategory
 )
+from app.model.finance_summary import finance_summary, finance_per_pupil
 from app.model.location import District
 from app.schema.finance_schema import (
     DOEFormGet, BalanceSheetGet, RevenueGet, ExpenditureGet,
-    FinancialReportGet, AllEntryTypesGet,
+    FinancialReportGet, FinancialReportRangeGet, AllEntryTypesGet,
+    FinancialSummaryGet, FinanceKindSummaryGet, FinanceCategoryTotalGet,
+    FinanceSuperCategoryTotalGet, FinanceFundTotalGet, FinancePerPupilGet,
     BalanceEntryTypeGet, RevenueEntryTypeGet, ExpenditureEntryTypeGet,
     BalanceEntryCategoryGet, RevenueEntryCategoryGet, ExpenditureEntryCategoryGet,
+    BalanceEntrySuperCategoryGet, RevenueEntrySuperCategoryGet, ExpenditureEntrySuperCategoryGet,
     BalanceFundTypeGet, RevenueFundTypeGet, ExpenditureFundTypeGet,
     AllFundTypesGet
 )
 from app.schema.location_schema import DistrictGet
 
+# Fact tables hanging off a DOE form, keyed by the FinancialReportGet field they fill:
+# (report field, model, entry type FK, fund type FK, DTO)
+REPORT_FACTS = [
+    ("balance_sheets", BalanceSheet, BalanceSheet.balance_entry_type_id_fk, BalanceSheet.balance_fund_type_id_fk, BalanceSheetGet),
+    ("revenues", Revenue, Revenue.revenue_entry_type_id_fk, Revenue.revenue_fund_type_id_fk, RevenueGet),
+    ("expenditures", Expenditure, Expenditure.expenditure_entry_type_id_fk, Expenditure.expenditure_fund_type_id_fk, ExpenditureGet),
+]
+REPORT_FACT_DTOS = {kind: dto for kind, _, _, _, dto in REPORT_FACTS}
+
 class FinanceService:
-    def get_doe_form(self, session: Session, district_id: int, year: int) -> Optional[DOEForm]:
-        """Get DOE form by district_id and year."""
-        statement = select(DOEForm).where(
+    def _report_rows_statement(self, *form_filters):
+        """
+        Build a single UNION ALL statement that returns every DOE form matching
+        form_filters together with its balance sheet, revenue and expenditure rows.
+        
+        Each row has a kind column ('doe_form' or the report field it belongs to)
+        and the id of its DOE form, and rows come back ordered by DOE form so a
+        caller can group them as they arrive.
+        """
+        no_int = cast(null(), Integer)
+        no_timestamp = cast(null(), DateTime)
+        
+        parts = [
+            select(
+                literal("doe_form").label("kind"),
+                DOEForm.id.label("doe_form_id"),
+                DOEForm.id.label("id"),
+                DOEForm.district_id_fk.label("district_id"),
+                DOEForm.year.label("year"),
+                DOEForm.date_created.label("date_created"),
+                DOEForm.date_updated.label("date_updated"),
+                no_int.label("entry_type_id"),
+                no_int.label("fund_type_id"),
+                cast(null(), Float).label("value")
+            ).where(*form_filters)
+        ]
+        for kind, model, entry_type_fk, fund_type_fk, _ in REPORT_FACTS:
+            parts.append(
+                select(
+                    literal(kind),
+                    model.doe_form_id_fk,
+                    model.id,
+                    DOEForm.district_id_fk,
+                    DOEForm.year,
+                    no_timestamp,
+                    no_timestamp,
+                    entry_type_fk,
+                    fund_type_fk,
+                    cast(model.value, Float)
+                )
+                .join(DOEForm, DOEForm.id == model.doe_form_id_fk)
+                .where(*form_filters)
+            )
+        
+        statement = union_all(*parts)
+        return statement.order_by(statement.selected_columns.doe_form_id, statement.selected_columns.id)
+    
+    def _build_reports(self, rows) -> List[FinancialReportGet]:
+        """Build one FinancialReportGet per DOE form from _report_rows_statement rows."""
+        forms: Dict[int, DOEFormGet] = {}
+        facts: Dict[int, Dict[str, list]] = {}
+        
+        for row in rows:
+            if row.kind == "doe_form":
+                forms[row.doe_form_id] = DOEFormGet(
+                    id=row.id,
+                    year=row.year,
+                    date_created=row.date_created,
+                    date_updated=row.date_updated,
+                    district_id=row.district_id
+                )
+                continue
+            
+            form_facts = facts.setdefault(row.doe_form_id, {kind: [] for kind in REPORT_FACT_DTOS})
+            form_facts[row.kind].append(REPORT_FACT_DTOS[row.kind](
+                id=row.id,
+                value=row.value,
+                entry_type_id=row.entry_type_id,
+                fund_type_id=row.fund_type_id
+            ))
+        
+        return [
+            FinancialReportGet(doe_form=doe_form, **facts.get(doe_form_id, {}))
+            for doe_form_id, doe_form in forms.items()
+        ]
+    
+    async def get_financial_report(self, session: AsyncSession, district_id: int, year: int) -> FinancialReportGet:
+        """
+        Get comprehensive financial report including DOE form and all related financial data
+        for a specific district and year.
+        
+        The DOE form and its three fact sets are fetched in one round trip.
+        """
+        statement = self._report_rows_statement(
             DOEForm.district_id_fk == district_id,
             DOEForm.year == year
         )
-        return session.exec(statement).first()
+        reports = self._build_reports((await session.exec(statement)).all())
+        if not reports:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Financial report not found for district ID {district_id} and year {year}"
+            )
+        
+        return reports[0]
     
-    def get_balance_sheets(self, session: Session, doe_form_id: int) -> List[BalanceSheet]:
-        """Get balance sheets for a DOE form."""
-        statement = select(BalanceSheet).where(BalanceSheet.doe_form_id_fk == doe_form_id)
-        return session.exec(statement).all()
+    async def get_financial_report_range(
+        self,
+        session: AsyncSession,
+        district_id: int,
+        start_year: int,
+        end_year: int
+    ) -> FinancialReportRangeGet:
+        """
+        Get the financial reports for a district for every year from start_year to
+        end_year (inclusive), keyed by year.
+        
+        All years are fetched in the same single round trip as get_financial_report.
+        """
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="start_year must not be after end_year")
+        
+        statement = self._report_rows_statement(
+            DOEForm.district_id_fk == district_id,
+            DOEForm.year >= start_year,
+            DOEForm.year <= end_year
+        )
+        reports = self._build_reports((await session.exec(statement)).all())
+        if not reports:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No financial reports found for district ID {district_id} between {start_year} and {end_year}"
+            )
+        
+        return FinancialReportRangeGet(
+            district_id=district_id,
+            start_year=start_year,
+            end_year=end_year,
+            reports={report.doe_form.year: report for report in sorted(reports, key=lambda r: r.doe_form.year)}
+        )
     
-    def get_revenues(self, session: Session, doe_form_id: int) -> List[Revenue]:
-        """Get revenues for a DOE form."""
-        statement = select(Revenue).where(Revenue.doe_form_id_fk == doe_form_id)
-        return session.exec(statement).all()
+    async def _get_report_batch(
+        self,
+        year: int,
+        district_ids: Optional[List[int]],
+        after_doe_form_id: int = 0
+    ) -> List[FinancialReportGet]:
+        """
+        Get the reports of the next FINANCE_STREAM_BATCH_FORMS DOE forms for the year
+        after after_doe_form_id, in DOE form order.
+        
+        Each batch opens and closes its own session, so the connection goes back to the
+        pool before the reports are handed to the client.
+        """
+        filters = [DOEForm.year == year, DOEForm.id > after_doe_form_id]
+        if district_ids:
+            filters.append(DOEForm.district_id_fk.in_(district_ids))
+        
+        async with AsyncSession(async_engine) as session:
+            doe_form_ids = (await session.exec(
+                select(DOEForm.id).where(*filters).order_by(DOEForm.id).limit(settings.FINANCE_STREAM_BATCH_FORMS)
+            )).all()
+            if not doe_form_ids:
+                return []
+            rows = (await session.exec(self._report_rows_statement(DOEForm.id.in_(doe_form_ids)))).all()
+        return self._build_reports(rows)
     
-    def get_expenditures(self, session: Session, doe_form_id: int) -> List[Expenditure]:
-        """Get expenditures for a DOE form."""
-        statement = select(Expenditure).where(Expenditure.doe_form_id_fk == doe_form_id)
-        return session.exec(statement).all()
+    async def stream_financial_reports(
+        self,
+        year: int,
+        district_ids: Optional[List[int]] = None
+    ) -> AsyncIterator[FinancialReportGet]:
+        """
+        Stream the financial report of every district (or only those in district_ids)
+        for a year, in batches of FINANCE_STREAM_BATCH_FORMS DOE forms.
+        
+        The first batch is read before this returns, so a database error or an empty
+        result is raised here as a proper error response rather than in the middle of
+        the stream. Later batches are read as the client consumes the stream, each
+        with its own short-lived session (keyset paging on the DOE form id).
+        """
+        batch = await self._get_report_batch(year, district_ids)
+        if not batch:
+            raise HTTPException(status_code=404, detail=f"No financial reports found for year {year}")
+        return self._report_batches(batch, year, district_ids)
     
-    def _enhance_balance_sheets(self, session: Session, balance_sheets: List[BalanceSheet]) -> List[BalanceSheetGet]:
-        """Enhance balance sheets with related data."""
-        result = []
-        for bs in balance_sheets:
-            bs_dto = BalanceSheetGet.from_orm(bs)
-            result.append(bs_dto)
-            
-        return result
+    async def _report_batches(
+        self,
+        batch: List[FinancialReportGet],
+        year: int,
+        district_ids: Optional[List[int]]
+    ) -> AsyncIterator[FinancialReportGet]:
+        """Yield the reports of batch and of every batch after it."""
+        while batch:
+            for report in batch:
+                yield report
+            if len(batch) < settings.FINANCE_STREAM_BATCH_FORMS:
+                return
+            batch = await self._get_report_batch(year, district_ids, after_doe_form_id=batch[-1].doe_form.id)
     
-    def _enhance_revenues(self, session: Session, revenues: List[Revenue]) -> List[RevenueGet]:
-        """Enhance revenues with related data."""
-        result = []
-        for rev in revenues:
-            rev_dto = RevenueGet.from_orm(rev)
-            result.append(rev_dto)
-            
-        return result
+    def _summary_statement(self, *filters):
+        """
+        Build a statement that totals the finance_summary rows matching filters for each
+        district and year, by category, super category, fund and overall.
+        
+        GROUPING SETS produce the four levels together; the no_* grouping flags tell
+        them apart.
+        """
+        fs = finance_summary.c
+        return (
+            select(
+                fs.district_id,
+                fs.year,
+                fs.kind,
+                func.grouping(fs.category_id).label("no_category"),
+                func.grouping(fs.super_category_id).label("no_super_category"),
+                func.grouping(fs.fund_type_id).label("no_fund"),
+                fs.category_id,
+                fs.category_name,
+                fs.super_category_id,
+                fs.super_category_name,
+                fs.fund_type_id,
+                fs.fund_state_id,
+                fs.fund_state_name,
+                cast(func.sum(fs.total), Float).label("total")
+            )
+            .where(*filters)
+            .group_by(
+                fs.district_id,
+                fs.year,
+                fs.kind,
+                func.grouping_sets(
+                    tuple_(fs.super_category_id, fs.super_category_name, fs.category_id, fs.category_name),
+                    tuple_(fs.super_category_id, fs.super_category_name),
+                    tuple_(fs.fund_type_id, fs.fund_state_id, fs.fund_state_name),
+                    tuple_()
+                )
+            )
+            .order_by(fs.district_id, fs.year)
+        )
     
-    def _enhance_expenditures(self, session: Session, expenditures: List[Expenditure]) -> List[ExpenditureGet]:
-        """Enhance expenditures with related data."""
-        result = []
-        for exp in expenditures:
-            exp_dto = ExpenditureGet.from_orm(exp)
-            result.append(exp_dto)
+    def _build_summaries(self, rows) -> List[FinancialSummaryGet]:
+        """Build one FinancialSummaryGet per district and year from _summary_statement rows."""
+        summaries: Dict[tuple, FinancialSummaryGet] = {}
+        for row in rows:
+            key = (row.district_id, row.year)
+            if key not in summaries:
+                summaries[key] = FinancialSummaryGet(
+                    district_id=row.district_id,
+                    year=row.year,
+                    **{kind: FinanceKindSummaryGet() for kind in REPORT_FACT_DTOS}
+                )
+            summary = getattr(summaries[key], row.kind)
             
-        return result
+            if not row.no_category:
+                summary.by_category.append(FinanceCategoryTotalGet(
+                    id=row.category_id,
+                    name=row.category_name,
+                    super_category_id=row.super_category_id,
+                    total=row.total
+                ))
+            elif not row.no_super_category:
+                summary.by_super_category.append(FinanceSuperCategoryTotalGet(
+                    id=row.super_category_id,
+                    name=row.super_category_name,
+                    total=row.total
+                ))
+            elif not row.no_fund:
+                summary.by_fund.append(FinanceFundTotalGet(
+                    id=row.fund_type_id,
+                    state_id=row.fund_state_id,
+                    state_name=row.fund_state_name,
+                    total=row.total
+                ))
+            else:
+                summary.total = row.total
+        
+        for report_summary in summaries.values():
+            for kind in REPORT_FACT_DTOS:
+                summary = getattr(report_summary, kind)
+                summary.by_category.sort(key=lambda total: total.id)
+                summary.by_super_category.sort(key=lambda total: total.id)
+                summary.by_fund.sort(key=lambda total: total.id)
+        return list(summaries.values())
     
-    def get_financial_report(self, session: Session, district_id: int, year: int) -> FinancialReportGet:
+    async def get_financial_summary(self, session: AsyncSession, district_id: int, year: int) -> FinancialSummaryGet:
         """
-        Get comprehensive financial report including DOE form and all related financial data
-        for a specific district and year.
+        Get the balance sheet, revenue and expenditure totals of a district's financial
+        report for a year, by category, super category and fund, plus grand totals.
+        
+        Totals are read from the finance_summary materialized view.
         """
-        # Get the DOE form
-        doe_form = self.get_doe_form(session, district_id, year)
-        if not doe_form:
+        statement = self._summary_statement(
+            finance_summary.c.district_id == district_id,
+            finance_summary.c.year == year
+        )
+        summaries = self._build_summaries((await session.exec(statement)).all())
+        if not summaries:
             raise HTTPException(
-                status_code=404, 
+                status_code=404,
                 detail=f"Financial report not found for district ID {district_id} and year {year}"
             )
         
-        # Get related data
-        balance_sheets = self.get_balance_sheets(session, doe_form.id)
-        revenues = self.get_revenues(session, doe_form.id)
-        expenditures = self.get_expenditures(session, doe_form.id)
+        return summaries[0]
+    
+    async def get_financial_comparison(
+        self,
+        session: AsyncSession,
+        year: int,
+        district_ids: Optional[List[int]] = None
+    ) -> List[FinancialSummaryGet]:
+        """
+        Get the financial totals of every district (or only those in district_ids) for a
+        year, for side by side comparison. Districts without a DOE form are left out.
         
-        # Enhance data with related entities
-        enhanced_balance_sheets = self._enhance_balance_sheets(session, balance_sheets)
-        enhanced_revenues = self._enhance_revenues(session, revenues)
-        enhanced_expenditures = self._enhance_expenditures(session, expenditures)
+        Totals are read from the finance_summary materialized view.
+        """
+        filters = [finance_summary.c.year == year]
+        if district_ids:
+            filters.append(finance_summary.c.district_id.in_(district_ids))
         
-        doe_form_dto = DOEFormGet.model_validate(doe_form.model_dump())
-
+        return self._build_summaries((await session.exec(self._summary_statement(*filters))).all())
+    
+    async def get_per_pupil(
+        self,
+        session: AsyncSession,
+        district_id: Optional[int] = None,
+        year: Optional[int] = None
+    ) -> List[FinancePerPupilGet]:
+        """
+        Get per pupil revenue and expenditure by district and year, for one district,
+        one year (all districts) or one district-year.
         
-        return FinancialReportGet(
-            doe_form=doe_form_dto,
-            balance_sheets=enhanced_balance_sheets,
-            revenues=enhanced_revenues,
-            expenditures=enhanced_expenditures
+        Values are read from the finance_per_pupil materialized view, which divides the
+        district's finance totals by the summed enrollment of its schools.
+        """
+        if district_id is None and year is None:
+            raise HTTPException(status_code=400, detail="Either district_id or year is required")
+        
+        fp = finance_per_pupil.c
+        statement = select(
+            fp.district_id,
+            fp.year,
+            fp.total_revenue,
+            fp.total_expenditure,
+            fp.enrollment,
+            fp.revenue_per_pupil,
+            fp.expenditure_per_pupil
         )
+        if district_id is not None:
+            statement = statement.where(fp.district_id == district_id)
+        if year is not None:
+            statement = statement.where(fp.year == year)
+        
+        rows = (await session.exec(statement.order_by(fp.district_id, fp.year))).all()
+        return [FinancePerPupilGet.model_validate(row._mapping) for row in rows]
     
-    def get_balance_entry_types(self, session: Session) -> List[BalanceEntryTypeGet]:
-        """Get all balance entry types with their categories and super categories."""
-        # Get all balance entry types
-        statement = select(BalanceEntryType)
-        entry_types = session.exec(statement).all()
+    async def _get_entry_types(
+        self,
+        session: AsyncSession,
+        entry_type_model,
+        category_model,
+        super_category_model,
+        category_fk,
+        super_category_fk,
+        entry_type_dto,
+        category_dto,
+        super_category_dto
+    ) -> List[Any]:
+        """
+        Load one entry type hierarchy (entry type -> category -> super category)
+        in a single joined query and build the DTOs straight from the columns.
+        """
+        statement = (
+            select(
+                entry_type_model.id,
+                entry_type_model.name,
+                entry_type_model.account_no,
+                entry_type_model.page,
+                entry_type_model.line,
+                category_model.id,
+                category_model.name,
+                super_category_model.id,
+                super_category_model.name
+            )
+            .outerjoin(category_model, category_fk == category_model.id)
+            .outerjoin(super_category_model, super_category_fk == super_category_model.id)
+            .order_by(entry_type_model.id)
+        )
+        rows = (await session.exec(statement)).all()
         
-        # Enhance with category and super category
         result = []
-        for entry_type in entry_types:
-            # Get category
-            category = session.get(BalanceEntryCategory, entry_type.balance_entry_category_type_id_fk)
-            
-            # Create enhanced entry type
-            enhanced_entry_type = BalanceEntryTypeGet.model_validate(entry_type.model_dump())
+        for (entry_id, entry_name, account_no, page, line,
+                category_id, category_name, super_category_id, super_category_name) in rows:
+            category = None
+            if category_id is not None:
+                super_category = None
+                if super_category_id is not None:
+                    super_category = super_category_dto(id=super_category_id, name=super_category_name)
+                category = category_dto(id=category_id, name=category_name, super_category=super_category)
             
-            if category:
-                # Get super category
-                super_category = session.get(BalanceEntrySuperCategory, category.balance_entry_super_category_type_id_fk)
-                
-                # Create enhanced category
-                enhanced_category = BalanceEntryCategoryGet.model_validate(category.model_dump())
-                
-                if super_category:
-                    enhanced_category.super_category = super_category
-                
-                enhanced_entry_type.category = enhanced_category
-            
-            result.append(enhanced_entry_type)
+            result.append(entry_type_dto(
+                id=entry_id,
+                name=entry_name,
+                account_no=account_no,
+                page=page,
+                line=line,
+                category=category
+            ))
         
         return result
     
-    def get_revenue_entry_types(self, session: Session) -> List[RevenueEntryTypeGet]:
+    async def get_balance_entry_types(self, session: AsyncSession) -> List[BalanceEntryTypeGet]:
+        """Get all balance entry types with their categories and super categories."""
+        return await self._get_entry_types(
+            session,
+            BalanceEntryType,
+            BalanceEntryCategory,
+            BalanceEntrySuperCategory,
+            BalanceEntryType.balance_entry_category_type_id_fk,
+            BalanceEntryCategory.balance_entry_super_category_type_id_fk,
+            BalanceEntryTypeGet,
+            BalanceEntryCategoryGet,
+            BalanceEntrySuperCategoryGet
+        )
+    
+    async def get_revenue_entry_types(self, session: AsyncSession) -> List[RevenueEntryTypeGet]:
         """Get all revenue entry types with their categories and super categories."""
-        # Get all revenue entry types
-        statement = select(RevenueEntryType)
-        entry_types = session.exec(statement).all()
-        
-        # Enhance with category and super category
-        result = []
-        for entry_type in entry_types:
-            # Get category
-            category = session.get(RevenueEntryCategory, entry_type.revenue_entry_category_type_id_fk)
-            
-            # Create enhanced entry type
-            enhanced_entry_type = RevenueEntryTypeGet.model_validate(entry_type.model_dump())
-            
-            if category:
-                # Get super category
-                super_category = session.get(RevenueEntrySuperCategory, category.revenue_entry_super_category_type_id_fk)
-                
-                # Create enhanced category
-                enhanced_category = RevenueEntryCategoryGet.model_validate(category.model_dump())
-                
-                if super_category:
-                    enhanced_category.super_category = super_category
-                
-                enhanced_entry_type.category = enhanced_category
-            
-            result.append(enhanced_entry_type)
-        
-        return result
+        return await self._get_entry_types(
+            session,
+            RevenueEntryType,
+            RevenueEntryCategory,
+            RevenueEntrySuperCategory,
+            RevenueEntryType.revenue_entry_category_type_id_fk,
+            RevenueEntryCategory.revenue_entry_super_category_type_id_fk,
+            RevenueEntryTypeGet,
+            RevenueEntryCategoryGet,
+            RevenueEntrySuperCategoryGet
+        )
     
-    def get_expenditure_entry_types(self, session: Session) -> List[ExpenditureEntryTypeGet]:
+    async def get_expenditure_entry_types(self, session: AsyncSession) -> List[ExpenditureEntryTypeGet]:
         """Get all expenditure entry types with their categories and super categories."""
-        # Get all expenditure entry types
-        statement = select(ExpenditureEntryType)
-        entry_types = session.exec(statement).all()
-        
-        # Enhance with category and super category
-        result = []
-        for entry_type in entry_types:
-            # Get category
-            category = session.get(ExpenditureEntryCategory, entry_type.expenditure_entry_category_type_id_fk)
-            
-            # Create enhanced entry type
-            enhanced_entry_type = ExpenditureEntryTypeGet.model_validate(entry_type.model_dump())
-            
-            if category:
-                # Get super category
-                super_category = session.get(ExpenditureEntrySuperCategory, category.expenditure_entry_super_category_type_id_fk)
-                
-                # Create enhanced category
-                enhanced_category = ExpenditureEntryCategoryGet.model_validate(category.model_dump())
-                
-                if super_category:
-                    enhanced_category.super_category = super_category
-                
-                enhanced_entry_type.category = enhanced_category
-            
-            result.append(enhanced_entry_type)
-        
-        return result
+        return await self._get_entry_types(
+            session,
+            ExpenditureEntryType,
+            ExpenditureEntryCategory,
+            ExpenditureEntrySuperCategory,
+            ExpenditureEntryType.expenditure_entry_category_type_id_fk,
+            ExpenditureEntryCategory.expenditure_entry_super_category_type_id_fk,
+            ExpenditureEntryTypeGet,
+            ExpenditureEntryCategoryGet,
+            ExpenditureEntrySuperCategoryGet
+        )
     
-    def get_all_entry_types(self, session: Session) -> AllEntryTypesGet:
+    @cached("finance.entry_types", maxsize=settings.REFERENCE_CACHE_MAXSIZE, ttl=settings.REFERENCE_CACHE_TTL,
+            data_version="finance")
+    async def get_all_entry_types(self, session: AsyncSession) -> AllEntryTypesGet:
         """Get all entry types (balance, revenue, expenditure) with their categories and super categories."""
-        balance_entry_types = self.get_balance_entry_types(session)
-        revenue_entry_types = self.get_revenue_entry_types(session)
-        expenditure_entry_types = self.get_expenditure_entry_types(session)
+        balance_entry_types = await self.get_balance_entry_types(session)
+        revenue_entry_types = await self.get_revenue_entry_types(session)
+        expenditure_entry_types = await self.get_expenditure_entry_types(session)
         
         return AllEntryTypesGet(
             balance_entry_types=balance_entry_types,
@@ -211,10 +499,10 @@ class FinanceService:
             expenditure_entry_types=expenditure_entry_types
         )
         
-    def get_balance_fund_types(self, session: Session) -> List[BalanceFundTypeGet]:
+    async def get_balance_fund_types(self, session: AsyncSession) -> List[BalanceFundTypeGet]:
         """Get all balance fund types."""
         statement = select(BalanceFundType)
-        fund_types = session.exec(statement).all()
+        fund_types = (await session.exec(statement)).all()
         
         result = []
         for fund_type in fund_types:
@@ -223,10 +511,10 @@ class FinanceService:
             
         return result
     
-    def get_revenue_fund_types(self, session: Session) -> List[RevenueFundTypeGet]:
+    async def get_revenue_fund_types(self, session: AsyncSession) -> List[RevenueFundTypeGet]:
         """Get all revenue fund types."""
         statement = select(RevenueFundType)
-        fund_types = session.exec(statement).all()
+        fund_types = (await session.exec(statement)).all()
         
         result = []
         for fund_type in fund_types:
@@ -235,10 +523,10 @@ class FinanceService:
             
         return result
     
-    def get_expenditure_fund_types(self, session: Session) -> List[ExpenditureFundTypeGet]:
+    async def get_expenditure_fund_types(self, session: AsyncSession) -> List[ExpenditureFundTypeGet]:
         """Get all expenditure fund types."""
         statement = select(ExpenditureFundType)
-        fund_types = session.exec(statement).all()
+        fund_types = (await session.exec(statement)).all()
         
         result = []
         for fund_type in fund_types:
@@ -247,11 +535,13 @@ class FinanceService:
             
         return result
         
-    def get_all_fund_types(self, session: Session) -> AllFundTypesGet:
+    @cached("finance.fund_types", maxsize=settings.REFERENCE_CACHE_MAXSIZE, ttl=settings.REFERENCE_CACHE_TTL,
+            data_version="finance")
+    async def get_all_fund_types(self, session: AsyncSession) -> AllFundTypesGet:
         """Get all fund types (balance, revenue, expenditure)."""
-        balance_fund_types = self.get_balance_fund_types(session)
-        revenue_fund_types = self.get_revenue_fund_types(session)
-        expenditure_fund_types = self.get_expenditure_fund_types(session)
+        balance_fund_types = await self.get_balance_fund_types(session)
+        revenue_fund_types = await self.get_revenue_fund_types(session)
+        expenditure_fund_types = await self.get_expenditure_fund_types(session)
         
         return AllFundTypesGet(
             balance_fund_types=balance_fund_types,
@@ -1,43 +1,50 @@
 from typing import List, Optional, Dict
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 
+from app.core.config import settings
+from app.core.utils.cache import cached
 from app.model.measurement import Measurement, MeasurementType, MeasurementTypeCategory, MeasurementStateTarget
 from app.schema.measurement_schema import (
     MeasurementGet, MeasurementTypeGet, MeasurementTypeCategoryGet
 )
 
 class MeasurementService:
-    def get_measurement_type_categories(self, session: Session) -> List[MeasurementTypeCategoryGet]:
+    @cached("measurement.type_categories", maxsize=settings.REFERENCE_CACHE_MAXSIZE, ttl=settings.REFERENCE_CACHE_TTL,
+            data_version="measurement")
+    async def get_measurement_type_categories(self, session: AsyncSession) -> List[MeasurementTypeCategoryGet]:
         """Get all measurement type categories."""
         return [MeasurementTypeCategoryGet.from_orm(category) 
-                for category in session.exec(select(MeasurementTypeCategory)).all()]
+                for category in (await session.exec(select(MeasurementTypeCategory))).all()]
 
-    def get_measurement_type_category_by_id(self, session: Session, category_id: int) -> MeasurementTypeCategoryGet:
+    async def get_measurement_type_category_by_id(self, session: AsyncSession, category_id: int) -> MeasurementTypeCategoryGet:
         """Get measurement type category by ID."""
-        category = session.get(MeasurementTypeCategory, category_id)
+        category = await session.get(MeasurementTypeCategory, category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Measurement type category not found")
         return MeasurementTypeCategoryGet.from_orm(category)
 
-    def get_measurement_types(self, session: Session, category_id: Optional[int] = None) -> List[MeasurementTypeGet]:
+    @cached("measurement.types", maxsize=settings.REFERENCE_CACHE_MAXSIZE, ttl=settings.REFERENCE_CACHE_TTL,
+            data_version="measurement")
+    async def get_measurement_types(self, session: AsyncSession, category_id: Optional[int] = None) -> List[MeasurementTypeGet]:
         """Get all measurement types, optionally filtered by category."""
         statement = select(MeasurementType)
         
         if category_id is not None:
             statement = statement.where(MeasurementType.measurement_type_category_id_fk == category_id)
             
-        types = session.exec(statement).all()
+        types = (await session.exec(statement)).all()
         return [MeasurementTypeGet.from_orm(type) for type in types]
 
-    def get_measurement_type_by_id(self, session: Session, type_id: int) -> MeasurementTypeGet:
+    async def get_measurement_type_by_id(self, session: AsyncSession, type_id: int) -> MeasurementTypeGet:
         """Get measurement type by ID."""
-        measurement_type = session.get(MeasurementType, type_id)
+        measurement_type = await session.get(MeasurementType, type_id)
         if not measurement_type:
             raise HTTPException(status_code=404, detail="Measurement type not found")
         return MeasurementTypeGet.from_orm(measurement_type)
 
-    def _get_state_targets(self, session: Session, measurements: List[Measurement]) -> Dict[tuple, float]:
+    async def _get_state_targets(self, session: AsyncSession, measurements: List[Measurement]) -> Dict[tuple, float]:
         """
         Helper method to get state targets for measurements.
         Returns a dictionary mapping (measurement_type_id, year) to target value.
@@ -55,15 +62,15 @@ class MeasurementService:
                 MeasurementStateTarget.measurement_type_id_fk == type_id,
                 MeasurementStateTarget.year == year
             )
-            target = session.exec(statement).first()
+            target = (await session.exec(statement)).first()
             if target:
                 targets[(type_id, year)] = target.field
                 
         return targets
 
-    def get_measurements(
+    async def get_measurements(
         self, 
-        session: Session, 
+        session: AsyncSession, 
         district_id: Optional[int] = None,
         school_id: Optional[int] = None,
         measurement_type_id: Optional[int] = None,
@@ -89,10 +96,10 @@ class MeasurementService:
         if year is not None:
             statement = statement.where(Measurement.year == year)
             
-        measurements = session.exec(statement).all()
+        measurements = (await session.exec(statement)).all()
         
         # Get state targets for these measurements
-        state_targets = self._get_state_targets(session, measurements)
+        state_targets = await self._get_state_targets(session, measurements)
         
         # Convert to response DTOs with state targets
         result = []
@@ -105,9 +112,9 @@ class MeasurementService:
             
         return result
 
-    def get_measurement_by_id(self, session: Session, measurement_id: int) -> MeasurementGet:
+    async def get_measurement_by_id(self, session: AsyncSession, measurement_id: int) -> MeasurementGet:
         """Get measurement by ID."""
-        measurement = session.get(Measurement, measurement_id)
+        measurement = await session.get(Measurement, measurement_id)
         if not measurement:
             raise HTTPException(status_code=404, detail="Measurement not found")
             
@@ -116,7 +123,7 @@ class MeasurementService:
             MeasurementStateTarget.measurement_type_id_fk == measurement.measurement_type_id_fk,
             MeasurementStateTarget.year == measurement.year
         )
-        target = session.exec(statement).first()
+        target = (await session.exec(statement)).first()
         
         # Convert to DTO and add state target if it exists
         measurement_dto = MeasurementGet.from_orm(measurement)
@@ -125,9 +132,9 @@ class MeasurementService:
             
         return measurement_dto
 
-    def get_latest_measurements(
+    async def get_latest_measurements(
         self,
-        session: Session,
+        session: AsyncSession,
         district_id: Optional[int] = None,
         school_id: Optional[int] = None
     ) -> List[MeasurementGet]:
@@ -172,10 +179,10 @@ class MeasurementService:
         if school_id is not None:
             statement = statement.where(Measurement.school_id_fk == school_id)
             
-        measurements = session.exec(statement).all()
+        measurements = (await session.exec(statement)).all()
         
         # Get state targets for these measurements
-        state_targets = self._get_state_targets(session, measurements)
+        state_targets = await self._get_state_targets(session, measurements)
         
         # Convert to response DTOs with state targets
         result = []
@@ -0,0 +1,160 @@
+"""
+Shared fixtures for the API tests.
+
+The tests run the app against a throwaway SQLite database (through aiosqlite)
+created from the models, so they need no Postgres. Every statement the app sends
+is counted with a before_cursor_execute hook, which lets a test pin how many
+queries an endpoint runs.
+
+    cd backend && python -m pytest app/tests
+"""
+import asyncio
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.v1 import deps
+from app.core import data_version
+from app.core.utils.cache import invalidate_all
+from app.main import app
+from app.model.base import BaseMixin
+from app.model.data_version import DataVersion
+from app.model.enrollment import SchoolEnrollment
+from app.model.finance import (
+    BalanceEntrySuperCategory, BalanceEntryCategory, BalanceEntryType, BalanceFundType,
+    RevenueEntrySuperCategory, RevenueEntryCategory, RevenueEntryType, RevenueFundType,
+    ExpenditureEntrySuperCategory, ExpenditureEntryCategory, ExpenditureEntryType, ExpenditureFundType
+)
+from app.model.location import (
+    SAU, SAUStaff, District, Region, SchoolType, Grade, Town, School, SchoolGradeLink, TownDistrictLink
+)
+from app.service.internal.location_snapshot import location_snapshot
+
+ENTRY_TYPE_MODELS = [
+    (BalanceEntrySuperCategory, BalanceEntryCategory, BalanceEntryType, BalanceFundType, 'balance'),
+    (RevenueEntrySuperCategory, RevenueEntryCategory, RevenueEntryType, RevenueFundType, 'revenue'),
+    (ExpenditureEntrySuperCategory, ExpenditureEntryCategory, ExpenditureEntryType, ExpenditureFundType, 'expenditure'),
+]
+
+
+class QueryCounter:
+    """before_cursor_execute listener that records every statement sent to the database."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+def seed_locations(session: Session, schools: int = 10) -> None:
+    """Three SAUs with staff, four districts, five towns and the given number of schools with enrollment."""
+    session.add_all([Town(id=i, name=f"Town {i}") for i in range(1, 6)])
+    session.add_all([SAU(id=i, name=f"SAU {i}", town_id_fk=i) for i in range(1, 4)])
+    session.add_all([SAUStaff(sau_id_fk=1 + i % 3, first_name="First", last_name=f"Last {i}", admin_type="SUP")
+                     for i in range(6)])
+    session.add_all([District(id=i, name=f"District {i}", sau_id_fk=1 + i % 3, is_public=i != 4) for i in range(1, 5)])
+    session.add_all([TownDistrictLink(town_id_fk=1 + i % 5, district_id_fk=1 + i % 4) for i in range(8)])
+    session.add_all([Region(id=1, name="Region"), SchoolType(id=1, name="Public")])
+    session.add_all([Grade(id=i, name=f"Grade {i}") for i in range(1, 6)])
+    session.add_all([School(id=100 + i, name=f"School {i}", district_id_fk=1 + i % 4, sau_id_fk=1, region_id_fk=1,
+                            school_type_id_fk=1, town_id_fk=1) for i in range(schools)])
+    session.add_all([SchoolGradeLink(school_id_fk=100 + i % schools, grade_id_fk=1 + i % 5)
+                     for i in range(2 * schools)])
+    session.add_all([SchoolEnrollment(school_id_fk=100 + i % schools, grade_id_fk=1 + i % 5, year=2020 + i % 3,
+                                      enrollment=10 + i) for i in range(6 * schools)])
+
+
+def seed_entry_types(session: Session) -> None:
+    """Two super categories, three categories and six entry types per finance family, plus two fund types."""
+    for super_category_model, category_model, entry_type_model, fund_type_model, family in ENTRY_TYPE_MODELS:
+        session.add_all([super_category_model(id=i, name=f"{family} super category {i}") for i in (1, 2)])
+        session.add_all([category_model(id=i, name=f"{family} category {i}",
+                                        **{f"{family}_entry_super_category_type_id_fk": 1 + i % 2})
+                         for i in (1, 2, 3)])
+        session.add_all([entry_type_model(id=i, name=f"{family} entry {i}", account_no=str(100 + i), page="1",
+                                          line=str(i), **{f"{family}_entry_category_type_id_fk": 1 + i % 3})
+                         for i in range(1, 7)])
+        session.add_all([fund_type_model(id=i, state_id=str(i), state_name=f"Fund {i}") for i in (1, 2)])
+
+
+@pytest.fixture
+def database(tmp_path) -> Engine:
+    """A seeded SQLite database, as a blocking engine tests can use to change data."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    BaseMixin.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed_locations(session)
+        seed_entry_types(session)
+        session.add_all([DataVersion(name=name) for name in ('location', 'measurement', 'enrollment', 'finance')])
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def queries() -> QueryCounter:
+    return QueryCounter()
+
+
+def reset_process_state() -> None:
+    """Forget the data versions, cached responses and location snapshot kept in this process."""
+    data_version._versions = {}
+    data_version._checked_at = 0.0
+    invalidate_all()
+    location_snapshot._snapshot = None
+
+
+def expire_data_versions() -> None:
+    """Make the next request re-read the data_version table, as after DATA_VERSION_CHECK_INTERVAL."""
+    data_version._checked_at = 0.0
+
+
+def bump_data_version(database: Engine, name: str) -> None:
+    """Bump a data version the way the data_version triggers do after a load."""
+    with database.begin() as connection:
+        connection.execute(text("UPDATE data_version SET version = version + 1 WHERE name = :name"), {"name": name})
+
+
+@pytest.fixture
+def async_engine(database, queries) -> AsyncEngine:
+    """
+    An async engine on the test database with its statements counted, for sessions
+    like the app's. The data versions, caches and snapshot of this process are reset
+    around the test.
+    """
+    # NullPool: TestClient runs each request on its own event loop, so connections can't be reused
+    engine = create_async_engine(str(database.url).replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    event.listen(engine.sync_engine, "before_cursor_execute", queries)
+    reset_process_state()
+    yield engine
+    reset_process_state()
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(async_engine) -> TestClient:
+    """
+    A client for the app with its sessions on the test database. The lifespan is not
+    run, so nothing connects to the configured Postgres.
+    """
+    async def get_test_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[deps.get_db] = get_test_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Dict, Optional
+
+import pytest
+
+from app.core.utils import cache as cache_module
+from app.core.utils.cache import TTLCache, cached
+
+
+class FakeClock:
+    """Stands in for the time module in app.core.utils.cache, only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch) -> Dict[str, TTLCache]:
+    """A fresh cache registry, so the caches a test declares don't clash with the app's or each other's."""
+    caches = {}
+    monkeypatch.setattr(cache_module, "_caches", caches)
+    return caches
+
+
+@pytest.fixture
+def versions(monkeypatch) -> Dict[str, Optional[int]]:
+    """Data versions the decorator reads, by dataset name; None is a version that can't be read."""
+    versions = {}
+
+    async def get_data_version(session, name):
+        return versions.get(name)
+
+    monkeypatch.setattr(cache_module, "get_data_version", get_data_version)
+    return versions
+
+
+def test_entry_expires_after_its_ttl(clock):
+    cache = TTLCache("test", maxsize=10, ttl=60)
+    cache.set("key", "value")
+
+    clock.advance(59)
+    assert cache.get("key") == (True, "value")
+    clock.advance(1)
+    assert cache.get("key") == (False, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted_at_maxsize(clock):
+    cache = TTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_key_is_the_bound_arguments_without_self_and_session(clock):
+    class Service:
+        def __init__(self):
+            self.calls = []
+
+        @cached("test_schools")
+        async def get_schools(self, session, district_id: Optional[int] = None, is_public: bool = True):
+            self.calls.append((district_id, is_public))
+            return [district_id, is_public]
+
+    service = Service()
+    other_service = Service()
+
+    asyncio.run(service.get_schools("session", 1))
+    asyncio.run(service.get_schools("other session", district_id=1, is_public=True))
+    asyncio.run(other_service.get_schools(None, 1))
+    asyncio.run(service.get_schools("session", 1, is_public=False))
+
+    assert service.calls == [(1, True), (1, False)]
+    assert other_service.calls == []
+    assert list(Service.get_schools.cache._data) == [
+        (("district_id", 1), ("is_public", True)),
+        (("district_id", 1), ("is_public", False)),
+    ]
+
+
+def test_changed_data_version_makes_entries_miss(clock, versions):
+    calls = []
+
+    @cached("test_districts", data_version="location")
+    async def get_districts(session):
+        calls.append(versions.get("location"))
+        return len(calls)
+
+    versions["location"] = 1
+    assert asyncio.run(get_districts(None)) == 1
+    assert asyncio.run(get_districts(None)) == 1
+
+    versions["location"] = 2
+    assert asyncio.run(get_districts(None)) == 2
+    assert get_districts.cache.data_version == 2
+
+    # Nothing is cached, or served from the cache, while the version can't be read
+    versions["location"] = None
+    assert asyncio.run(get_districts(None)) == 3
+    assert asyncio.run(get_districts(None)) == 4
+    assert calls == [1, 2, None, None]
@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from app.tests.conftest import bump_data_version, expire_data_versions
+
+ENTRY_TYPES_URL = "/api/v1/finance/entry-types"
+
+# data_version read + one outer-joined hierarchy query per family (balance, revenue, expenditure)
+COLD_QUERIES = 1 + 3
+
+
+def entry_type_queries(queries):
+    return [statement for statement in queries.statements if "_entry_type" in statement]
+
+
+def test_entry_type_hierarchy_loads_in_one_outer_joined_query_per_family(client, queries):
+    response = client.get(ENTRY_TYPES_URL)
+
+    assert response.status_code == 200
+    assert queries.count == COLD_QUERIES
+    statements = entry_type_queries(queries)
+    assert len(statements) == 3
+    for statement in statements:
+        assert statement.count("LEFT OUTER JOIN") == 2
+
+    body = response.json()
+    for family in ("balance", "revenue", "expenditure"):
+        entry_types = body[f"{family}_entry_types"]
+        assert [entry_type["id"] for entry_type in entry_types] == [1, 2, 3, 4, 5, 6]
+        # entry 1 -> category 2 -> super category 1
+        assert entry_types[0]["category"]["id"] == 2
+        assert entry_types[0]["category"]["super_category"]["id"] == 1
+
+
+def test_cached_entry_types_run_no_queries(client, queries):
+    first = client.get(ENTRY_TYPES_URL)
+    queries.reset()
+
+    second = client.get(ENTRY_TYPES_URL)
+
+    assert second.status_code == 200
+    assert queries.count == 0
+    assert second.json() == first.json()
+
+
+def test_entry_types_reload_after_finance_data_version_bump(client, queries, database):
+    client.get(ENTRY_TYPES_URL)
+    with database.begin() as connection:
+        connection.execute(text("UPDATE balance_entry_type SET name = 'renamed' WHERE id = 1"))
+
+    # Unchanged version: still served from the cache
+    expire_data_versions()
+    queries.reset()
+    assert client.get(ENTRY_TYPES_URL).json()["balance_entry_types"][0]["name"] == "balance entry 1"
+    assert queries.count == 1
+
+    bump_data_version(database, "finance")
+    expire_data_versions()
+    queries.reset()
+    response = client.get(ENTRY_TYPES_URL)
+
+    assert queries.count == COLD_QUERIES
+    assert response.json()["balance_entry_types"][0]["name"] == "renamed"
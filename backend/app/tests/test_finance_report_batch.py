@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.model.finance import DOEForm, BalanceSheet, Revenue, Expenditure
+from app.service.public import finance_service as finance_service_module
+from app.service.public.finance_service import finance_service
+
+BATCH_URL = "/api/v1/finance/report/batch"
+BATCH_FORMS = 2
+
+
+@pytest.fixture
+def doe_forms(database, monkeypatch):
+    """Three 2021 DOE forms with one fact of each kind, read in batches of BATCH_FORMS forms."""
+    with Session(database) as session:
+        session.add_all([DOEForm(id=i, district_id_fk=i, year=2021) for i in (1, 2, 3)])
+        session.add(DOEForm(id=4, district_id_fk=4, year=2020))
+        for i in (1, 2, 3, 4):
+            session.add(BalanceSheet(doe_form_id_fk=i, balance_entry_type_id_fk=1, balance_fund_type_id_fk=1, value=i))
+            session.add(Revenue(doe_form_id_fk=i, revenue_entry_type_id_fk=1, revenue_fund_type_id_fk=1, value=i))
+            session.add(Expenditure(doe_form_id_fk=i, expenditure_entry_type_id_fk=1, expenditure_fund_type_id_fk=1,
+                                    value=i))
+        session.commit()
+    monkeypatch.setattr(settings, "FINANCE_STREAM_BATCH_FORMS", BATCH_FORMS)
+
+
+@pytest.fixture
+def stream_engine(database, queries, monkeypatch):
+    """The stream opens its own sessions, on this pooled engine for the test database."""
+    # Pooled explicitly, SQLAlchemy before 2.0.38 defaults file databases on aiosqlite to NullPool
+    engine = create_async_engine(str(database.url).replace("sqlite://", "sqlite+aiosqlite://"),
+                                 poolclass=AsyncAdaptedQueuePool)
+    event.listen(engine.sync_engine, "before_cursor_execute", queries)
+    monkeypatch.setattr(finance_service_module, "async_engine", engine)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_batch_streams_one_report_per_line_in_doe_form_batches(client, queries, doe_forms, stream_engine):
+    response = client.get(BATCH_URL, params={"year": 2021})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    reports = [json.loads(line) for line in response.text.splitlines()]
+    assert [report["doe_form"]["id"] for report in reports] == [1, 2, 3]
+    assert all(len(report[kind]) == 1 for report in reports for kind in ("balance_sheets", "revenues", "expenditures"))
+    # Two batches (2 forms, then 1), each a DOE form id query and a report rows query
+    assert queries.count == 4
+
+
+def test_batch_filters_by_district(client, doe_forms, stream_engine):
+    response = client.get(BATCH_URL, params={"year": 2021, "district_id": [3, 1]})
+
+    assert [json.loads(line)["doe_form"]["id"] for line in response.text.splitlines()] == [1, 3]
+
+
+def test_batch_without_reports_is_a_404(client, doe_forms, stream_engine):
+    response = client.get(BATCH_URL, params={"year": 1999})
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "No financial reports found for year 1999"}
+
+
+def test_batch_error_after_first_batch_ends_stream_with_error_line(client, doe_forms, stream_engine, monkeypatch):
+    get_report_batch = finance_service._get_report_batch
+    calls = []
+
+    async def failing_after_first_batch(*args, **kwargs):
+        calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError("connection lost")
+        return await get_report_batch(*args, **kwargs)
+
+    monkeypatch.setattr(finance_service, "_get_report_batch", failing_after_first_batch)
+    response = client.get(BATCH_URL, params={"year": 2021})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["doe_form"]["id"] for line in lines[:-1]] == [1, 2]
+    assert lines[-1] == {"detail": "Internal server error"}
+
+
+def test_no_connection_is_held_while_the_client_reads(doe_forms, stream_engine):
+    async def read_stream():
+        checked_out = []
+        async for _ in await finance_service.stream_financial_reports(year=2021):
+            checked_out.append(stream_engine.pool.checkedout())
+        return checked_out
+
+    assert asyncio.run(read_stream()) == [0, 0, 0]
@@ -0,0 +1,88 @@
+import pytest
+from sqlmodel import Session
+
+from app.model.enrollment import SchoolEnrollment
+from app.model.location import School, SchoolGradeLink
+from app.tests.conftest import bump_data_version, expire_data_versions
+
+LOCATION_URL = "/api/v1/location"
+
+# Every /location endpoint, with each of its filters
+LOCATION_REQUESTS = [
+    ("/sau", {}),
+    ("/sau", {"district_id": 1}),
+    ("/sau", {"include_staff": False}),
+    ("/sau/1", {}),
+    ("/district", {}),
+    ("/district", {"is_public": True}),
+    ("/district", {"school_id": 100}),
+    ("/district/1", {}),
+    ("/school", {}),
+    ("/school", {"district_id": 1}),
+    ("/school/100", {}),
+    ("/region", {}),
+    ("/region/1", {}),
+    ("/school-type", {}),
+    ("/school-type/1", {}),
+    ("/grade", {}),
+    ("/grade/1", {}),
+    ("/town", {}),
+    ("/town", {"district_id": 1}),
+    ("/town/1", {}),
+]
+
+# data_version read + the location snapshot build: regions, school types, grades,
+# SAU staff, SAUs, town/district links, districts, towns, school/grade links,
+# latest enrollment and schools
+SNAPSHOT_QUERIES = 1 + 11
+
+
+def get(client, path, params):
+    response = client.get(LOCATION_URL + path, params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+@pytest.mark.parametrize("path,params", LOCATION_REQUESTS)
+def test_first_request_builds_the_snapshot_in_a_fixed_number_of_queries(client, queries, path, params):
+    get(client, path, params)
+
+    assert queries.count == SNAPSHOT_QUERIES
+
+
+def test_every_endpoint_runs_no_queries_once_the_snapshot_is_built(client, queries):
+    get(client, "/region", {})
+    queries.reset()
+
+    for path, params in LOCATION_REQUESTS:
+        get(client, path, params)
+
+    assert queries.statements == []
+
+
+def test_query_count_does_not_grow_with_the_number_of_schools(database, client, queries):
+    with Session(database) as session:
+        session.add_all([School(id=1000 + i, name=f"Extra school {i}", district_id_fk=1 + i % 4, sau_id_fk=1,
+                                region_id_fk=1, school_type_id_fk=1, town_id_fk=1) for i in range(200)])
+        session.add_all([SchoolGradeLink(school_id_fk=1000 + i, grade_id_fk=1 + i % 5) for i in range(200)])
+        session.add_all([SchoolEnrollment(school_id_fk=1000 + i, grade_id_fk=1 + i % 5, year=2022, enrollment=i + 1)
+                         for i in range(200)])
+        session.commit()
+
+    schools = get(client, "/school", {}).json()
+
+    assert len(schools) == 210
+    assert queries.count == SNAPSHOT_QUERIES
+    assert schools[-1]["latest_enrollment"] == {"Grade 5": 200, "total": 200}
+
+
+def test_location_data_change_rebuilds_the_snapshot_once(database, client, queries):
+    get(client, "/region", {})
+    bump_data_version(database, "location")
+    expire_data_versions()
+    queries.reset()
+
+    for path, params in LOCATION_REQUESTS:
+        get(client, path, params)
+
+    assert queries.count == SNAPSHOT_QUERIES
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.service.internal import location_snapshot as location_snapshot_module
+from app.service.internal.location_snapshot import UNREAD_VERSIONS, location_snapshot
+from app.tests.conftest import expire_data_versions
+
+CONCURRENT_REQUESTS = 5
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Versions of every snapshot built during the test."""
+    built = []
+    build_location_snapshot = location_snapshot_module.build_location_snapshot
+
+    async def counting_build(session, versions=UNREAD_VERSIONS):
+        built.append(versions)
+        return await build_location_snapshot(session, versions)
+
+    monkeypatch.setattr(location_snapshot_module, "build_location_snapshot", counting_build)
+    return built
+
+
+def hide_data_versions(database):
+    """Make the data_version table unreadable, as while migrations are running."""
+    with database.begin() as connection:
+        connection.execute(text("ALTER TABLE data_version RENAME TO data_version_hidden"))
+
+
+def restore_data_versions(database):
+    with database.begin() as connection:
+        connection.execute(text("ALTER TABLE data_version_hidden RENAME TO data_version"))
+
+
+def get_snapshots(async_engine, requests=1):
+    """The snapshots served to concurrent requests, each with its own session."""
+    async def get():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await location_snapshot.get(session)
+
+    async def get_all():
+        return await asyncio.gather(*[get() for _ in range(requests)])
+
+    return asyncio.run(get_all())
+
+
+def test_concurrent_requests_without_data_versions_build_one_snapshot(database, async_engine, builds):
+    hide_data_versions(database)
+
+    snapshots = get_snapshots(async_engine, CONCURRENT_REQUESTS)
+
+    assert builds == [UNREAD_VERSIONS]
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert len(snapshots[0].schools) == 10
+
+    # Kept while the versions still can't be read
+    assert get_snapshots(async_engine)[0] is snapshots[0]
+    assert builds == [UNREAD_VERSIONS]
+
+
+def test_last_snapshot_is_served_while_data_versions_cant_be_read(database, async_engine, builds):
+    snapshot, = get_snapshots(async_engine)
+    hide_data_versions(database)
+    expire_data_versions()
+
+    assert get_snapshots(async_engine, CONCURRENT_REQUESTS) == [snapshot] * CONCURRENT_REQUESTS
+    assert builds == [(1, 1)]
+
+
+def test_snapshot_is_rebuilt_once_data_versions_can_be_read_again(database, async_engine, builds):
+    hide_data_versions(database)
+    get_snapshots(async_engine)
+    restore_data_versions(database)
+    expire_data_versions()
+
+    snapshot, = get_snapshots(async_engine)
+
+    assert builds == [UNREAD_VERSIONS, (1, 1)]
+    assert snapshot.versions == (1, 1)
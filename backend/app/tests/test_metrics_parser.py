@@ -0,0 +1,54 @@
+"""
+Golden output of the vectorized metrics parser.
+
+The expected frames in data/ are the output of the row-by-row parser the metrics
+migration used before app.service.internal.metrics_parser, run on the committed
+metrics workbooks with the years the migration reads from each.
+"""
+import os
+from typing import Dict, Tuple
+
+import pandas as pd
+import pytest
+import yaml
+
+from app.service.internal.metrics_parser import process_measurements
+
+ALEMBIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../alembic'))
+CONFIG_PATH = os.path.join(ALEMBIC_DIR, 'config/generate_metrics_config.yaml')
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+INPUT_FILES = ['default_input', '2021_input', '2018_input']
+
+
+def measurement_frames(measurements: Dict[str, dict]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """The parsed entities and their measurements as two frames, both in output order."""
+    entities = pd.DataFrame(
+        [(entity['id'], entity['name'], entity['type']) for entity in measurements.values()],
+        columns=['id', 'name', 'type']
+    )
+    rows = pd.DataFrame(
+        [(entity['id'], measurement['indicator'], measurement['year'], measurement['value'])
+         for entity in measurements.values() for measurement in entity['measurements']],
+        columns=['entity_id', 'indicator', 'year', 'value']
+    )
+    return entities, rows
+
+
+def expected_path(workbook_path: str, name: str) -> str:
+    """Expected frame of a workbook, e.g. data/2024-school-metrics_entities.parquet."""
+    return os.path.join(DATA_DIR, f"{os.path.splitext(os.path.basename(workbook_path))[0]}_{name}.parquet")
+
+
+@pytest.mark.parametrize("input_key", INPUT_FILES)
+def test_process_measurements_matches_legacy_output(input_key):
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+    config['column_mappings']['measurement_years'] = config['file_settings']['file_years'][input_key]
+    workbook_path = os.path.abspath(os.path.join(ALEMBIC_DIR, 'versions', config['file_settings'][input_key]))
+
+    measurements = process_measurements(pd.read_excel(workbook_path), config)
+
+    assert list(measurements) == [entity['id'] for entity in measurements.values()]
+    entities, rows = measurement_frames(measurements)
+    pd.testing.assert_frame_equal(entities, pd.read_parquet(expected_path(workbook_path, 'entities')))
+    pd.testing.assert_frame_equal(rows, pd.read_parquet(expected_path(workbook_path, 'measurements')))
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import db
+from app.core.db import InstrumentedAsyncQueuePool, PoolStats
+
+
+@pytest.fixture
+def stats(monkeypatch) -> PoolStats:
+    stats = PoolStats()
+    monkeypatch.setattr(db, "pool_stats", stats)
+    return stats
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    """A one connection pool with one overflow connection and a short timeout."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedAsyncQueuePool,
+                                 pool_size=1, max_overflow=1, pool_timeout=0.1)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_checkouts_timeouts_and_connects_are_counted_separately(stats, pool_engine):
+    async def checkouts():
+        async with pool_engine.connect() as first:
+            await first.execute(text("SELECT 1"))
+            async with pool_engine.connect() as overflow:
+                await overflow.execute(text("SELECT 1"))
+                with pytest.raises(exc.TimeoutError):
+                    async with pool_engine.connect():
+                        pass
+        # Reuses a pooled connection
+        async with pool_engine.connect():
+            pass
+
+    asyncio.run(checkouts())
+    snapshot = stats.snapshot(pool_engine.pool)
+
+    assert snapshot["checkouts"] == 3
+    assert snapshot["timeouts"] == 1
+    assert snapshot["connects"] == 2
+    assert sum(snapshot["wait_ms"]["histogram"].values()) == 3
+
+
+def test_retried_checkout_is_counted_once(stats, pool_engine, monkeypatch):
+    # The first overflow attempt loses the race for the overflow slot, so QueuePool._do_get retries itself
+    pool = pool_engine.pool
+    inc_overflow = pool._inc_overflow
+    attempts = []
+
+    def losing_first_attempt():
+        attempts.append(1)
+        return len(attempts) > 1 and inc_overflow()
+
+    monkeypatch.setattr(pool, "_inc_overflow", losing_first_attempt)
+
+    async def checkout():
+        async with pool_engine.connect():
+            pass
+
+    asyncio.run(checkout())
+
+    assert len(attempts) == 2
+    assert stats.snapshot(pool)["checkouts"] == 1
@@ -0,0 +1,137 @@
+"""
+Throughput benchmark for the read endpoints, sync vs async.
+
+Runs the same set of GET requests against one or more running deployments and
+reports requests/second and latency percentiles for each. To compare the old
+threadpool (sync `def`) handlers with the async ones, start a build of each on
+its own port with the same worker count, against the same database, and point a
+target at each. The sync build is the parent of the commit that moved the routes
+to the async engine ("Serve API routes from an async engine and async services"):
+
+    git worktree add /tmp/sync-backend "$(git log --format=%H -1 --grep='async engine and async services')^"
+    cd /tmp/sync-backend/backend && uvicorn app.main:app --port 8001 --workers 4
+    cd backend && uvicorn app.main:app --port 8000 --workers 4
+
+    python scripts/benchmark_async.py \
+        --target sync=http://localhost:8001 \
+        --target async=http://localhost:8000 \
+        --requests 2000 --concurrency 200
+
+Concurrency well above 40 is what exposes the difference: sync handlers queue
+behind Starlette's 40-thread limiter, async handlers only wait on Postgres.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/api/v1/location/grade",
+    "/api/v1/location/district",
+    "/api/v1/location/school?district_id=1",
+    "/api/v1/measurement/type",
+    "/api/v1/measurement/latest?district_id=1",
+    "/api/v1/enrollment/school/22480/latest",
+    "/api/v1/finance/report?district_id=1&year=2024",
+]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    path: str,
+    total_requests: int,
+    concurrency: int
+) -> Tuple[float, List[float], int]:
+    """Fire total_requests GETs at path with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def benchmark_target(
+    base_url: str,
+    endpoints: List[str],
+    total_requests: int,
+    concurrency: int
+) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60, verify=False) as client:
+        for path in endpoints:
+            # Warm up connections and any server-side caches before timing
+            await run_endpoint(client, path, min(concurrency, total_requests), concurrency)
+            elapsed, latencies, errors = await run_endpoint(client, path, total_requests, concurrency)
+            results[path] = {
+                "rps": total_requests / elapsed,
+                "p50_ms": statistics.median(latencies) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "errors": errors,
+            }
+    return results
+
+
+def print_report(all_results: Dict[str, Dict[str, dict]], endpoints: List[str]) -> None:
+    labels = list(all_results.keys())
+    for path in endpoints:
+        print(f"\n{path}")
+        print(f"  {'target':<10} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>8}")
+        for label in labels:
+            r = all_results[label][path]
+            print(f"  {label:<10} {r['rps']:>10.1f} {r['p50_ms']:>10.1f} {r['p95_ms']:>10.1f} "
+                  f"{r['p99_ms']:>10.1f} {r['errors']:>8}")
+        if len(labels) > 1:
+            baseline = all_results[labels[0]][path]["rps"]
+            for label in labels[1:]:
+                ratio = all_results[label][path]["rps"] / baseline if baseline else float("inf")
+                print(f"  {label} vs {labels[0]}: {ratio:.2f}x throughput")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True,
+                        help="label=base_url, may be given more than once (first one is the baseline)")
+    parser.add_argument("--endpoint", action="append", help="Path to request, defaults to a mixed read set")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint per target")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+    args = parser.parse_args()
+
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+    all_results = {}
+    for target in args.target:
+        label, _, base_url = target.partition("=")
+        print(f"Benchmarking {label} at {base_url} ...")
+        all_results[label] = asyncio.run(
+            benchmark_target(base_url, endpoints, args.requests, args.concurrency)
+        )
+    print_report(all_results, endpoints)
+
+
+if __name__ == "__main__":
+    main()
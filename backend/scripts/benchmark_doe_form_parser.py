@@ -0,0 +1,147 @@
+"""
+DOE-25 parser benchmark, legacy per-entry sheet scan vs indexed lookup.
+
+Reads one workbook from assets/finance, then parses the sheet repeatedly with the
+legacy lookup (a copy of the scan the finance migration used to do: four
+astype(str).str.strip() comparisons over the whole sheet for every entry type)
+and with app.service.internal.doe_form_parser, which indexes the sheet once.
+Both must produce the same entries; the workbook read itself is timed separately
+since it is the same for both.
+
+    python scripts/benchmark_doe_form_parser.py
+    python scripts/benchmark_doe_form_parser.py --file app/alembic/assets/finance/2015/berlin-doe-25-2015.xlsx --runs 20
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+from typing import List, Tuple
+
+import pandas as pd
+import yaml
+
+from app.service.internal.doe_form_parser import (
+    BalanceSheetEntry, RevenueEntry, ExpenditureEntry, DOEFormData,
+    parse_doe_sheet, read_doe_sheet
+)
+
+ALEMBIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../app/alembic'))
+CONFIG_PATH = os.path.join(ALEMBIC_DIR, 'config/generate_finance_config.yaml')
+
+
+def legacy_process_entry_row(df: pd.DataFrame,
+                             entry_data: tuple,
+                             fund_types: List[Tuple],
+                             entry_type: str,
+                             year: int) -> List[Tuple[int, int, float]]:
+    """The lookup parse_doe_form used before the sheet index, minus the logging."""
+    entries = []
+
+    if len(entry_data) > 7 and year not in entry_data[7]:
+        return entries
+
+    entry_id, entry_name, page, line, account_no, category_id, excel_column = entry_data[:7]
+
+    page_str = str(page)
+    line_str = str(line)
+    account_str = str(account_no) if account_no else 'nan'
+
+    row = df[
+        (df.iloc[:, 0].astype(str).str.strip() == excel_column.strip()) &
+        (df.iloc[:, 1].astype(str).str.strip() == page_str) &
+        (df.iloc[:, 2].astype(str).str.strip() == line_str) &
+        (df.iloc[:, 4].astype(str).str.strip() == account_str)
+    ]
+
+    if row.empty:
+        return entries
+
+    for fund_id, fund_state_id, state_name, column_letter in fund_types:
+        column_index = ord(column_letter) - ord('A')
+        value = row.iloc[0, column_index]
+
+        if pd.notna(value):
+            try:
+                float_value = float(str(value).replace(',', ''))
+                if float_value != 0:
+                    if entry_type == 'expenditure':
+                        float_value = round(float_value, 2)
+                    entries.append((entry_id, fund_id, float_value))
+            except (ValueError, TypeError):
+                continue
+
+    return entries
+
+
+def legacy_parse(df: pd.DataFrame, year: int, config: dict, district_id: int) -> DOEFormData:
+    def process_entries(entry_types, fund_types, entry_type, entry_class):
+        entries = []
+        for entry_type_data in entry_types:
+            for e in legacy_process_entry_row(df, entry_type_data, fund_types, entry_type, year):
+                entries.append(entry_class(entry_type_id=e[0], fund_type_id=e[1], value=e[2]))
+        return entries
+
+    return DOEFormData(
+        district_id=district_id,
+        year=year,
+        balance_entries=process_entries(config['initial_data']['balance_entry_type'],
+                                        config['initial_data']['balance_fund_type'],
+                                        'balance sheet', BalanceSheetEntry),
+        revenue_entries=process_entries(config['revenue_data']['revenue_entry_type'],
+                                        config['revenue_data']['revenue_fund_type'],
+                                        'revenue', RevenueEntry),
+        expenditure_entries=process_entries(config['expenditure_data']['expenditure_entry_type'],
+                                            config['expenditure_data']['expenditure_fund_type'],
+                                            'expenditure', ExpenditureEntry)
+    )
+
+
+def time_runs(func, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+    default_file = os.path.abspath(os.path.join(ALEMBIC_DIR, 'versions', config['file_settings']['test_file']))
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=default_file, help="DOE-25 workbook (defaults to the config's test_file)")
+    parser.add_argument("--runs", type=int, default=10, help="Timed parses per parser")
+    args = parser.parse_args()
+
+    year = int(re.search(r'(\d{4})\.xlsx?$', args.file).group(1))
+
+    start = time.perf_counter()
+    df = read_doe_sheet(args.file, config['file_settings']['sheet_name'])
+    read_seconds = time.perf_counter() - start
+    if df is None:
+        raise SystemExit(f"Could not read {args.file}")
+    district_id = int(df.iloc[0, 1])
+
+    legacy = legacy_parse(df, year, config, district_id)
+    indexed = parse_doe_sheet(df, args.file, year, config, district_id)
+    if legacy != indexed:
+        raise SystemExit("Legacy and indexed parsers disagree")
+
+    entries = len(indexed.balance_entries) + len(indexed.revenue_entries) + len(indexed.expenditure_entries)
+    legacy_timings = time_runs(lambda: legacy_parse(df, year, config, district_id), args.runs)
+    indexed_timings = time_runs(lambda: parse_doe_sheet(df, args.file, year, config, district_id), args.runs)
+
+    legacy_ms = statistics.median(legacy_timings) * 1000
+    indexed_ms = statistics.median(indexed_timings) * 1000
+    print(f"{os.path.basename(args.file)}: {df.shape[0]} rows, {entries} entries parsed, identical output")
+    print(f"  workbook read:  {read_seconds * 1000:10.1f} ms (once, same for both)")
+    print(f"  legacy parse:   {legacy_ms:10.1f} ms median")
+    print(f"  indexed parse:  {indexed_ms:10.1f} ms median")
+    print(f"  speedup:        {legacy_ms / indexed_ms:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
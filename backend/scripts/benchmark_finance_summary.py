@@ -0,0 +1,91 @@
+"""
+Query time of the finance totals, finance_summary view vs raw fact tables.
+
+Runs the statement behind /finance/report/summary and /finance/comparison twice:
+once as the API runs it, against the finance_summary materialized view, and once
+with the view swapped for its own defining query, i.e. aggregating balance_sheet,
+revenue and expenditure through doe_form on every call. Both must return the same
+rows; the script reports median and p95 time for each.
+
+    python scripts/benchmark_finance_summary.py --year 2024 --district-id 1 --runs 50
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.core.db import engine
+from app.model.finance_summary import finance_summary
+from app.service.public.finance_service import finance_service
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def time_query(connection, sql: str, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        connection.execute(text(sql)).all()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, view_timings: List[float], raw_timings: List[float]) -> None:
+    def p95(values: List[float]) -> float:
+        return sorted(values)[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+
+    view_median = statistics.median(view_timings) * 1000
+    raw_median = statistics.median(raw_timings) * 1000
+    print(f"\n{label}")
+    print(f"  {'source':<14} {'median ms':>10} {'p95 ms':>10}")
+    print(f"  {'raw tables':<14} {raw_median:>10.2f} {p95(raw_timings) * 1000:>10.2f}")
+    print(f"  {'summary view':<14} {view_median:>10.2f} {p95(view_timings) * 1000:>10.2f}")
+    print(f"  speedup: {raw_median / view_median if view_median else float('inf'):.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, required=True, help="Report year")
+    parser.add_argument("--district-id", type=int, required=True, help="District for the single-report query")
+    parser.add_argument("--runs", type=int, default=50, help="Timed runs per query")
+    args = parser.parse_args()
+
+    queries = {
+        f"summary: district {args.district_id}, {args.year}": finance_service._summary_statement(
+            finance_summary.c.district_id == args.district_id,
+            finance_summary.c.year == args.year
+        ),
+        f"comparison: all districts, {args.year}": finance_service._summary_statement(
+            finance_summary.c.year == args.year
+        ),
+    }
+
+    with engine.connect() as connection:
+        view_definition = connection.execute(
+            text("SELECT pg_get_viewdef('finance_summary'::regclass, true)")
+        ).scalar_one().rstrip().rstrip(";")
+
+        for label, statement in queries.items():
+            view_sql = compile_sql(statement)
+            raw_sql = view_sql.replace("FROM finance_summary", f"FROM ({view_definition}) AS finance_summary")
+
+            view_rows = sorted(map(tuple, connection.execute(text(view_sql)).all()), key=repr)
+            raw_rows = sorted(map(tuple, connection.execute(text(raw_sql)).all()), key=repr)
+            if view_rows != raw_rows:
+                print(f"\n{label}: view and raw tables disagree, refresh the view first "
+                      f"(python -m app.refresh_finance_summary)")
+                continue
+
+            # One untimed run each to warm the buffer cache
+            view_timings = time_query(connection, view_sql, args.runs + 1)[1:]
+            raw_timings = time_query(connection, raw_sql, args.runs + 1)[1:]
+            report(f"{label} ({len(view_rows)} rows)", view_timings, raw_timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+School metrics parser benchmark, legacy iterrows walk vs vectorized parse.
+
+Reads each metrics workbook of the metrics migration (2024, 2021 and 2018) with the
+years the migration uses for it, then parses the sheet repeatedly with the legacy
+parser (a copy of the row-by-row walk the migration used to do, with clean_value
+called on every year cell) and with app.service.internal.metrics_parser, and reports
+the median parse time of each. That both produce the same output is checked by
+app/tests/test_metrics_parser.py.
+
+    python scripts/benchmark_metrics_parser.py
+    python scripts/benchmark_metrics_parser.py --runs 5
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+from typing import List
+
+import pandas as pd
+import yaml
+
+from app.service.internal.metrics_parser import process_measurements
+
+ALEMBIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../app/alembic'))
+CONFIG_PATH = os.path.join(ALEMBIC_DIR, 'config/generate_metrics_config.yaml')
+INPUT_FILES = ['default_input', '2021_input', '2018_input']
+
+
+def legacy_clean_value(value, config):
+    """The clean_value the metrics migration used before the vectorized parser."""
+    if pd.isna(value) or value == "" or value in config['special_values']['null_values']:
+        return None
+
+    value_str = str(value)
+
+    if any(pattern in value_str for pattern in config['special_values']['skip_patterns']):
+        return None
+
+    if value_str.startswith(">") or value_str.startswith("<"):
+        cleaned = re.sub(r'[^0-9.]', '', value_str)
+    else:
+        cleaned = re.sub(r'[^0-9.-]', '', value_str)
+
+    return cleaned if cleaned != "" else None
+
+
+def legacy_process_measurements(df, config):
+    """The process_measurements the metrics migration used before the vectorized parser."""
+    measurements = {}
+    current_indicator = None
+    current_type = None
+
+    for _, row in df.iterrows():
+        entity_id = row.get(config['column_mappings']['entity_id'])
+        entity_type = row.get(config['column_mappings']['entity_type'])
+        indicator = row.get(config['column_mappings']['indicator_name'])
+
+        if pd.notna(indicator):
+            current_indicator = indicator
+        if pd.notna(entity_type):
+            current_type = entity_type
+
+        if current_indicator is None or pd.isna(entity_id) or current_type is None:
+            continue
+
+        entity_id = str(entity_id)
+
+        if entity_id not in measurements:
+            measurements[entity_id] = {
+                'id': entity_id,
+                'name': row.get(config['column_mappings']['entity_name'], "Unknown"),
+                'type': current_type,
+                'measurements': []
+            }
+
+        for year in config['column_mappings']['measurement_years']:
+            if year in row and not pd.isna(row[year]):
+                value = legacy_clean_value(row[year], config)
+                if value is not None:
+                    measurements[entity_id]['measurements'].append({
+                        'indicator': current_indicator,
+                        'year': year,
+                        'value': value
+                    })
+
+    return measurements
+
+
+def time_runs(func, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Timed parses per parser and workbook")
+    args = parser.parse_args()
+
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+
+    for input_key in INPUT_FILES:
+        file_path = os.path.abspath(os.path.join(ALEMBIC_DIR, 'versions', config['file_settings'][input_key]))
+        file_config = dict(config)
+        file_config['column_mappings'] = dict(config['column_mappings'])
+        file_config['column_mappings']['measurement_years'] = config['file_settings']['file_years'][input_key]
+        df = pd.read_excel(file_path)
+
+        vectorized = process_measurements(df, file_config)
+        count = sum(len(entity['measurements']) for entity in vectorized.values())
+        legacy_ms = statistics.median(time_runs(lambda: legacy_process_measurements(df, file_config), args.runs)) * 1000
+        vectorized_ms = statistics.median(time_runs(lambda: process_measurements(df, file_config), args.runs)) * 1000
+        print(f"{os.path.basename(file_path)}: {df.shape[0]} rows, {len(vectorized)} entities, "
+              f"{count} measurements")
+        print(f"  legacy parse:     {legacy_ms:10.1f} ms median")
+        print(f"  vectorized parse: {vectorized_ms:10.1f} ms median")
+        print(f"  speedup:          {legacy_ms / vectorized_ms:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
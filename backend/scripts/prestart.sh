@@ -7,4 +7,7 @@ set -x
 python app/backend_pre_start.py
 
 # Run migrations
-alembic upgrade head
\ No newline at end of file
+alembic upgrade head
+
+# Rebuild the finance summary views if the migrations changed the data they are built from
+python -m app.refresh_finance_summary --if-changed
\ No newline at end of file